@@ -0,0 +1,711 @@
+import os
+import io
+import sys
+import json
+import glob
+import pickle
+import hashlib
+import time
+import argparse
+import tempfile
+import contextlib
+import zipfile
+import subprocess
+
+from lxml import etree
+
+import main as generator
+from main import (NS, DocxWriter, StreamingDocxWriter, XSDDocumentationGenerator, build_doc_index, detect_encoding,
+                  documentation_text)
+
+XS = 'http://www.w3.org/2001/XMLSchema'
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+EXAMPLE_DIR = os.path.join(ROOT_DIR, 'example')
+EXAMPLE_ROOT = os.path.join(EXAMPLE_DIR, 'cbr_ed503_v2026.03.0.xsd')
+EXAMPLE_LEAFTYPES = os.path.join(EXAMPLE_DIR, 'cbr_ed_leaftypes_v2026.03.0.xsd')
+EXAMPLE_OBJECTS = os.path.join(EXAMPLE_DIR, 'cbr_ed_objects_v2026.03.0.xsd')
+BASELINE_PATH = os.path.join(ROOT_DIR, 'benchmark_baseline.json')
+TARGET_NS = 'urn:bench:xsd'
+PHASES = ('load', 'front', 'section4', 'section5', 'section6', 'section7', 'save')
+# Фазы короче этого порога при сравнении с эталоном не учитываются: разброс у них больше самих замеров.
+MIN_COMPARED_SECONDS = 0.05
+
+
+def synthetic_schema(index, includes, simple_types=40, enum_values=8, complex_types=20, nesting=1, global_elements=1,
+                     shared_types=0):
+    lines = [
+        '<?xml version="1.0" encoding="windows-1251"?>',
+        f'<xs:schema xmlns:xs="{XS}" xmlns:b="{TARGET_NS}" targetNamespace="{TARGET_NS}" elementFormDefault="qualified">',
+    ]
+    for name in includes:
+        lines.append(f'\t<xs:include schemaLocation="{name}"/>')
+
+    lines.append(f'\t<xs:element name="Msg{index}" type="b:Msg{index}Type">')
+    lines.append(f'\t\t<xs:annotation><xs:documentation>Сообщение {index}</xs:documentation></xs:annotation>')
+    lines.append('\t</xs:element>')
+    for g in range(1, global_elements):
+        lines.append(f'\t<xs:element name="Item{index}_{g}" type="b:Block{index}_{g % complex_types or 1}"/>')
+
+    for t in range(simple_types):
+        lines.append(f'\t<xs:simpleType name="Text{index}_{t}">')
+        lines.append(f'\t\t<xs:annotation><xs:documentation>Строка {t} файла {index}</xs:documentation></xs:annotation>')
+        lines.append('\t\t<xs:restriction base="xs:string">')
+        lines.append(f'\t\t\t<xs:minLength value="1"/><xs:maxLength value="{10 + t}"/>')
+        lines.append('\t\t</xs:restriction>')
+        lines.append('\t</xs:simpleType>')
+        lines.append(f'\t<xs:simpleType name="Code{index}_{t}">')
+        lines.append('\t\t<xs:restriction base="xs:string">')
+        for v in range(enum_values):
+            lines.append(f'\t\t\t<xs:enumeration value="C{v}"><xs:annotation>'
+                         f'<xs:documentation>Значение {v}</xs:documentation></xs:annotation></xs:enumeration>')
+        lines.append('\t\t</xs:restriction>')
+        lines.append('\t</xs:simpleType>')
+
+    # Общие перечисления одинаково определены в каждом файле (как копии справочников в пакетах ЦБ).
+    for t in range(shared_types):
+        lines.append(f'\t<xs:simpleType name="SharedCode{t}">')
+        lines.append(f'\t\t<xs:annotation><xs:documentation>Общий справочник {t}</xs:documentation></xs:annotation>')
+        lines.append('\t\t<xs:restriction base="xs:string">')
+        for v in range(enum_values):
+            lines.append(f'\t\t\t<xs:enumeration value="S{v}"><xs:annotation>'
+                         f'<xs:documentation>Общее значение {v}</xs:documentation></xs:annotation></xs:enumeration>')
+        lines.append('\t\t</xs:restriction>')
+        lines.append('\t</xs:simpleType>')
+
+    # Типы образуют цепочки длиной nesting: каждый тип цепочки содержит элемент следующего.
+    for t in range(complex_types):
+        name = f'Msg{index}Type' if t == 0 else f'Block{index}_{t}'
+        lines.append(f'\t<xs:complexType name="{name}">')
+        lines.append(f'\t\t<xs:annotation><xs:documentation>Блок {t}</xs:documentation></xs:annotation>')
+        lines.append('\t\t<xs:sequence>')
+        for e in range(5):
+            lines.append(f'\t\t\t<xs:element name="Field{e}" type="b:Text{index}_{e % simple_types}" minOccurs="{e % 2}">'
+                         f'<xs:annotation><xs:documentation>Поле {e}</xs:documentation></xs:annotation></xs:element>')
+        if (t + 1) % nesting and t + 1 < complex_types:
+            lines.append(f'\t\t\t<xs:element name="Nested" type="b:Block{index}_{t + 1}"/>')
+        lines.append('\t\t</xs:sequence>')
+        lines.append(f'\t\t<xs:attribute name="Kind" type="b:Code{index}_0" use="required"/>')
+        lines.append('\t</xs:complexType>')
+
+    lines.append('</xs:schema>')
+    return '\n'.join(lines).encode('cp1251')
+
+
+def package_includes(files, fanout=3, depth=None):
+    # Без depth файлы образуют дерево с ветвлением fanout; с depth корень подключает
+    # цепочки файлов длиной depth, так что глубина вложенности xs:include задаётся явно.
+    if depth is None:
+        return [list(range(index * fanout + 1, min(files, index * fanout + fanout + 1))) for index in range(files)]
+    includes = [[] for _ in range(files)]
+    for index in range(1, files):
+        if (index - 1) % depth == 0:
+            includes[0].append(index)
+        else:
+            includes[index - 1].append(index)
+    return includes
+
+
+def make_synthetic_package(directory, files, fanout=3, depth=None, **sizes):
+    paths = []
+    for index, included in enumerate(package_includes(files, fanout, depth)):
+        children = [f'bench_{c}.xsd' for c in included]
+        path = os.path.join(directory, f'bench_{index}.xsd')
+        with open(path, 'wb') as f:
+            f.write(synthetic_schema(index, children, **sizes))
+        paths.append(path)
+    return paths
+
+
+def time_load(paths, workers, repeat):
+    best = None
+    for _ in range(repeat):
+        gen = XSDDocumentationGenerator(load_workers=workers)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.load_schemas(paths[:1])
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_loading(args):
+    print(f"Процессоров: {os.cpu_count()}, потоков загрузки: {args.workers}")
+    print(f"{'файлов':>8} {'послед., с':>12} {'паралл., с':>12} {'ускорение':>10}")
+    for files in args.files:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = make_synthetic_package(directory, files)
+            serial = time_load(paths, 1, args.repeat)
+            parallel = time_load(paths, args.workers, args.repeat)
+        print(f"{files:>8} {serial:>12.3f} {parallel:>12.3f} {serial / parallel:>9.2f}x")
+
+
+def bench_archive(args):
+    with tempfile.TemporaryDirectory() as directory:
+        package_dir = os.path.join(directory, 'pkg')
+        os.makedirs(package_dir)
+        paths = make_synthetic_package(package_dir, args.files, depth=3)
+        archive_path = os.path.join(directory, 'pkg.zip')
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for path in paths:
+                archive.write(path, os.path.basename(path))
+
+        def extracted():
+            target = tempfile.mkdtemp(dir=directory)
+            with zipfile.ZipFile(archive_path) as archive:
+                archive.extractall(target)
+            return sorted(glob.glob(os.path.join(target, '*.xsd')))
+
+        cache_dir = os.path.join(directory, 'cache')
+        print(f"Файлов в архиве: {args.files}, размер архива: {os.path.getsize(archive_path) // 1024} КБ")
+        for title, sources in (("распаковка на диск и загрузка", extracted), ("загрузка из архива", lambda: [archive_path])):
+            best = None
+            for _ in range(args.repeat + 1):
+                # Разобранные схемы берутся из кэша, чтобы в замер попадали в основном чтение файлов и include.
+                gen = XSDDocumentationGenerator(cache=generator.SchemaCache(cache_dir))
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    gen.load_schemas(sources())
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{title:<30} {best:.3f} с, схем: {len(gen.schemas)}")
+
+
+def bench_example(args):
+    timings = []
+    with tempfile.TemporaryDirectory() as directory:
+        output_path = os.path.join(directory, 'example.docx')
+        for _ in range(args.repeat):
+            gen = XSDDocumentationGenerator()
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                gen.load_schemas([EXAMPLE_ROOT])
+                loaded = time.perf_counter()
+                gen.generate_docx([], output_path)
+                finished = time.perf_counter()
+            timings.append((loaded - started, finished - loaded))
+        size = os.path.getsize(output_path)
+    load, render = min(timings, key=lambda t: t[0] + t[1])
+    print(f"Загрузка схем: {load:.3f} с")
+    print(f"Разделы и сохранение DOCX: {render:.3f} с")
+    print(f"Размер документа: {size} байт")
+
+
+def bench_service(args):
+    import threading
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tempfile.TemporaryDirectory() as directory:
+        def timed(func):
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        def cold():
+            gen = XSDDocumentationGenerator(seed=0)
+            gen.generate_docx([EXAMPLE_ROOT], os.path.join(directory, 'cold.docx'))
+
+        service = generator.GenerationService({'no_cache': True, 'seed': 0}, workers=args.workers,
+                                              output_dir=directory)
+        server = generator.make_service_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/generate"
+
+        def request(index=0):
+            body = json.dumps({'inputs': [EXAMPLE_ROOT], 'output': f'warm{index}.docx'})
+            post = urllib.request.Request(url, body.encode('utf-8'), {'Content-Type': 'application/json'})
+            with urllib.request.urlopen(post) as response:
+                response.read()
+
+        def burst():
+            with ThreadPoolExecutor(max_workers=args.clients) as clients:
+                list(clients.map(request, range(args.clients)))
+
+        # Вывод генератора и журнал запросов службы не нужны в отчёте.
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            cold_time = timed(cold)
+            request()
+            warm_time = timed(request)
+            burst_time = timed(burst)
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    print(f"Отдельный запуск без кэша: {cold_time:.3f} с")
+    print(f"Запрос к прогретой службе: {warm_time:.3f} с")
+    print(f"{args.clients} одновременных запросов, потоков службы {service.workers}: {burst_time:.3f} с "
+          f"({burst_time / args.clients:.3f} с на запрос)")
+
+
+def make_message_package(directory, messages):
+    # Общие зависимости из example/ и копии cbr_ed503 с переименованными сообщением и типами.
+    for path in glob.glob(os.path.join(EXAMPLE_DIR, 'cbr_ed_*.xsd')):
+        with open(path, 'rb') as src, open(os.path.join(directory, os.path.basename(path)), 'wb') as dst:
+            dst.write(src.read())
+    with open(EXAMPLE_ROOT, 'rb') as f:
+        message = f.read()
+    for index in range(messages):
+        name = f'ED9{index:02d}'
+        data = message.replace(b'ED503', name.encode('ascii'))
+        data = data.replace(b'SWIFTContainer', f'SWIFTContainer{index}'.encode('ascii'))
+        with open(os.path.join(directory, f'cbr_{name.lower()}.xsd'), 'wb') as f:
+            f.write(data)
+    return sorted(glob.glob(os.path.join(directory, '*.xsd')))
+
+
+def bench_fanout(args):
+    with tempfile.TemporaryDirectory() as directory:
+        package_dir = os.path.join(directory, 'pkg')
+        os.makedirs(package_dir)
+        paths = make_message_package(package_dir, args.messages)
+        messages = [path for path in paths if os.path.basename(path).startswith('cbr_ed9')]
+        print(f"Сообщений: {len(messages)}, процессоров: {os.cpu_count()}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            for path in messages:
+                XSDDocumentationGenerator(seed=0).generate_docx([path], os.path.join(directory, 'separate.docx'))
+            separate = time.perf_counter() - started
+            timings = []
+            for workers in args.workers:
+                started = time.perf_counter()
+                XSDDocumentationGenerator(seed=0).generate_fan_out(paths, os.path.join(directory, f'out{workers}'),
+                                                                   workers=workers)
+                timings.append((workers, time.perf_counter() - started))
+    print(f"{'отдельные запуски':<28} {separate:.3f} с")
+    for workers, elapsed in timings:
+        print(f"{f'--fan-out, процессов {workers}':<28} {elapsed:.3f} с")
+
+
+def bench_prune(args):
+    with tempfile.TemporaryDirectory() as directory:
+        for title, prune in (("все компоненты", False), ("только достижимые", True)):
+            output_path = os.path.join(directory, f'prune{int(prune)}.docx')
+            best = None
+            for _ in range(args.repeat):
+                gen = XSDDocumentationGenerator(seed=0, prune=prune)
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    gen.load_schemas([EXAMPLE_ROOT])
+                    started = time.perf_counter()
+                    gen.generate_docx([], output_path)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{title:<20} {best:.3f} с, {os.path.getsize(output_path)} байт")
+            if prune:
+                print(next(line for line in output.getvalue().splitlines() if line.startswith('Отсечение')))
+
+
+def bench_tables(args):
+    # Таблица в духе раздела 4: размер word/document.xml на строку, время построения, сохранения и открытия.
+    from docx import Document
+
+    headers = ["Тип", "Элемент", "Тип данных", "Описание", "Обязательность"]
+    rows = [[f"Type{index // 20}", f"Element{index}", "string", f"Описание элемента {index}", "Да"]
+            for index in range(args.rows)]
+    with tempfile.TemporaryDirectory() as directory:
+        for title, writer_class in (("python-docx", DocxWriter), ("потоковая", StreamingDocxWriter)):
+            output_path = os.path.join(directory, 'tables.docx')
+            started = time.perf_counter()
+            doc = writer_class(output_path)
+            doc.add_table(headers, rows)
+            built = time.perf_counter() - started
+            started = time.perf_counter()
+            doc.close()
+            saved = time.perf_counter() - started
+            with zipfile.ZipFile(output_path) as archive:
+                size = archive.getinfo('word/document.xml').file_size
+            started = time.perf_counter()
+            Document(output_path)
+            opened = time.perf_counter() - started
+            print(f"{title:<12} построение {built:.3f} с, сохранение {saved:.3f} с, открытие {opened:.3f} с, "
+                  f"document.xml {size} байт ({size / args.rows:.0f} на строку), файл {os.path.getsize(output_path)} байт")
+
+
+def bench_volumes(args):
+    # Открытие документа python-docx - грубая оценка того, как долго Word будет открывать самый большой том.
+    from docx import Document
+
+    print(f"Файлов в пакете: {args.files}, бюджет тома: {args.rows} строк таблиц")
+    with tempfile.TemporaryDirectory() as directory:
+        package_dir = os.path.join(directory, 'pkg')
+        os.makedirs(package_dir)
+        paths = make_synthetic_package(package_dir, args.files, depth=3)
+        for title, rows in (("один документ", None), ("по томам", args.rows)):
+            output_path = os.path.join(directory, f'{"volumes" if rows else "single"}.docx')
+            elapsed = None
+            for _ in range(args.repeat):
+                gen = XSDDocumentationGenerator(seed=0, volume_rows=rows)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    gen.load_schemas(paths)
+                    started = time.perf_counter()
+                    outputs = gen.generate_docx([], output_path, streaming=args.streaming)
+                run = time.perf_counter() - started
+                elapsed = run if elapsed is None else min(elapsed, run)
+            largest = max(outputs, key=os.path.getsize)
+            started = time.perf_counter()
+            Document(largest)
+            opened = time.perf_counter() - started
+            print(f"{title:<14} {elapsed:.3f} с, документов {len(outputs)}, "
+                  f"самый большой {os.path.getsize(largest)} байт, открытие {opened:.3f} с")
+
+
+def best_run(command, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_startup(args):
+    commands = (
+        ("Интерпретатор", [sys.executable, '-c', 'pass']),
+        ("Импорт main", [sys.executable, '-c', 'import main']),
+        ("main.py --help", [sys.executable, 'main.py', '--help']),
+        ("Импорт python-docx", [sys.executable, '-c', 'import docx']),
+        ("Импорт tkinter", [sys.executable, '-c', 'import tkinter']),
+    )
+    for title, command in commands:
+        try:
+            print(f"{title}: {best_run(command, args.repeat) * 1000:.0f} мс")
+        except subprocess.CalledProcessError:
+            print(f"{title}: недоступно")
+
+
+def bench_batch(args):
+    print(f"Процессоров: {os.cpu_count()}, наборов: {args.sets}, файлов в наборе: {args.files}")
+    with tempfile.TemporaryDirectory() as directory:
+        sets = []
+        for index in range(args.sets):
+            set_dir = os.path.join(directory, f'set_{index}')
+            os.makedirs(set_dir)
+            make_synthetic_package(set_dir, args.files)
+            sets.append(os.path.join(set_dir, 'bench_0.xsd'))
+        output_dir = os.path.join(directory, 'out')
+        for jobs in args.jobs:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.main(sets + ['--batch', '--no-cache', '-j', str(jobs), '-o', output_dir])
+            elapsed = time.perf_counter() - started
+            print(f"процессов {jobs:>3}: {elapsed:.2f} с, {args.sets / elapsed:.2f} док./с")
+
+
+def time_phases(paths, output_path, streaming=False, repeat=1):
+    # Повторяет последовательность generate_docx, замеряя каждую фазу отдельно; берётся
+    # лучшее время каждой фазы по всем повторам.
+    best = {}
+    for _ in range(repeat):
+        gen = XSDDocumentationGenerator(seed=0)
+        timings = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            gen.load_schemas(paths)
+            timings['load'] = time.perf_counter() - started
+
+            doc = (StreamingDocxWriter if streaming else DocxWriter)(output_path)
+            steps = [(phase, funcs) for phase, (_, funcs) in zip(PHASES[1:], gen.document_sections())]
+            steps.append(('save', (lambda d: d.close(),)))
+            for phase, funcs in steps:
+                started = time.perf_counter()
+                for func in funcs:
+                    func(doc)
+                timings[phase] = time.perf_counter() - started
+        for phase, elapsed in timings.items():
+            best[phase] = min(best.get(phase, elapsed), elapsed)
+    return best
+
+
+def phase_cases(args):
+    sizes = dict(simple_types=args.simple_types, enum_values=args.enum_values, complex_types=args.complex_types,
+                 nesting=args.nesting, global_elements=args.elements, shared_types=args.shared_types)
+    for files in args.files:
+        name = (f"synthetic files={files} depth={args.depth} simple={args.simple_types} enum={args.enum_values} "
+                f"complex={args.complex_types} nesting={args.nesting} elements={args.elements}")
+        if args.shared_types:
+            name += f" shared={args.shared_types}"
+        yield name, files, sizes
+    if args.example:
+        yield 'example', None, None
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    regressions = []
+    for case, timings in results.items():
+        reference = baseline.get(case)
+        if not reference:
+            continue
+        for phase in PHASES:
+            old = reference.get(phase)
+            new = timings.get(phase)
+            if old is None or new is None or max(old, new) < MIN_COMPARED_SECONDS:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{case}: {phase} {old:.3f} с -> {new:.3f} с (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def bench_phases(args):
+    results = {}
+    print(f"{'':>6}" + ''.join(f"{phase:>10}" for phase in PHASES) + f"{'всего':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        output_path = os.path.join(directory, 'out.docx')
+        for name, files, sizes in phase_cases(args):
+            if files is None:
+                paths = [EXAMPLE_ROOT]
+            else:
+                package_dir = os.path.join(directory, f'pkg_{files}')
+                os.makedirs(package_dir)
+                paths = make_synthetic_package(package_dir, files, depth=args.depth, **sizes)
+            timings = time_phases(paths, output_path, args.streaming, args.repeat)
+            results[name] = {phase: round(elapsed, 4) for phase, elapsed in timings.items()}
+            label = 'пример' if files is None else str(files)
+            print(f"{label:>6}" + ''.join(f"{timings[phase]:>10.3f}" for phase in PHASES) +
+                  f"{sum(timings.values()):>10.3f}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"Эталон сохранён: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Эталон не найден: {args.baseline}")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"Замедление относительно эталона (допуск {args.tolerance * 100:.0f}%):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"Замедлений относительно эталона нет (допуск {args.tolerance * 100:.0f}%).")
+    return 0
+
+
+def bench_formats(args):
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [('пример', [EXAMPLE_ROOT])]
+        if args.files:
+            package_dir = os.path.join(directory, 'pkg')
+            os.makedirs(package_dir)
+            cases.append((f"{args.files} файлов", make_synthetic_package(package_dir, args.files, depth=3)))
+        print(f"{'':>12}" + ''.join(f"{fmt:>10}" for fmt in args.formats))
+        for title, paths in cases:
+            timings = []
+            for fmt in args.formats:
+                best = None
+                for _ in range(args.repeat):
+                    gen = XSDDocumentationGenerator(seed=0)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        gen.load_schemas(paths)
+                        started = time.perf_counter()
+                        gen.generate([], os.path.join(directory, f'out.{fmt}'), fmt)
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                timings.append(best)
+            print(f"{title:>12}" + ''.join(f"{t:>10.3f}" for t in timings))
+
+
+def bench_render(args):
+    print(f"Процессоров: {os.cpu_count()}, файлов в пакете: {args.files}")
+    with tempfile.TemporaryDirectory() as directory:
+        package_dir = os.path.join(directory, 'pkg')
+        os.makedirs(package_dir)
+        paths = make_synthetic_package(package_dir, args.files, depth=3)
+        output_path = os.path.join(directory, 'out.docx')
+        for workers in args.workers:
+            best = None
+            for _ in range(args.repeat):
+                gen = XSDDocumentationGenerator(seed=0, render_workers=workers)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    gen.load_schemas(paths)
+                    started = time.perf_counter()
+                    gen.generate_docx([], output_path, streaming=args.streaming)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"процессов отрисовки {workers:>3}: {best:.3f} с")
+
+
+def extract_run(path, stream_parse, repeat):
+    # Выполняется в отдельном процессе, чтобы пик RSS относился только к одному способу разбора.
+    with open(path, 'rb') as f:
+        raw_data = f.read()
+    gen = XSDDocumentationGenerator(stream_parse=stream_parse)
+    rss_before = generator.peak_rss_bytes()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        record = gen.extract_schema(path, raw_data)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    rss_after = generator.peak_rss_bytes()
+    growth = rss_after - rss_before if rss_before is not None else None
+    return best, growth, hashlib.sha256(pickle.dumps(record)).hexdigest()
+
+
+def bench_extract(args):
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [(os.path.basename(args.schema), args.schema)]
+        if args.synthetic:
+            path = os.path.join(directory, 'large.xsd')
+            with open(path, 'wb') as f:
+                f.write(synthetic_schema(0, [], simple_types=args.synthetic, complex_types=args.synthetic))
+            cases.append((f"синтетическая схема, {os.path.getsize(path) // (1024 * 1024)} МБ", path))
+
+        for title, path in cases:
+            print(title)
+            digests = set()
+            for label, stream_parse in (("DOM и XPath", False), ("iterparse", True)):
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    elapsed, growth, digest = pool.submit(extract_run, path, stream_parse, args.repeat).result()
+                digests.add(digest)
+                memory = f"{growth / (1024 * 1024):.1f} МБ" if growth is not None else "н/д"
+                print(f"  {label:<12} {elapsed:>8.3f} с, прирост пика RSS {memory}")
+            print("  Записи совпадают" if len(digests) == 1 else "  Записи РАЗЛИЧАЮТСЯ")
+
+
+def descendant_doc(node):
+    doc = node.find('.//xs:annotation/xs:documentation[1]', namespaces=NS)
+    if doc is None:
+        doc = node.find('.//xs:annotation/xs:documentation', namespaces=NS)
+    return documentation_text(doc) if doc is not None else ""
+
+
+def bench_docs(args):
+    with open(args.schema, 'rb') as f:
+        raw_data = f.read()
+    root = etree.fromstring(raw_data, etree.XMLParser(encoding=detect_encoding(raw_data), recover=True))
+    components = [root] + root.xpath('//xs:simpleType[@name] | //xs:complexType[@name] | //xs:element | '
+                                     '//xs:enumeration', namespaces=NS)
+
+    def search():
+        return [descendant_doc(node) for node in components]
+
+    def index():
+        docs = build_doc_index(root)
+        return [docs.get(node, "") for node in components]
+
+    print(f"Компонентов: {len(components)}")
+    for title, func in (("Поиск по потомкам", search), ("Индекс документации", index)):
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{title}: {best * 1000:.1f} мс")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности генератора документации XSD")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    loading = sub.add_parser('loading', help="Последовательная и параллельная загрузка графа include/import")
+    loading.add_argument('--files', type=int, nargs='+', default=[4, 16, 64])
+    loading.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1))
+    loading.add_argument('--repeat', type=int, default=3)
+    loading.set_defaults(func=bench_loading)
+
+    archive = sub.add_parser('archive', help="Загрузка пакета схем из ZIP-архива и после распаковки на диск")
+    archive.add_argument('--files', type=int, default=64)
+    archive.add_argument('--repeat', type=int, default=3)
+    archive.set_defaults(func=bench_archive)
+
+    example = sub.add_parser('example', help="Полная генерация документа по схемам из каталога example/")
+    example.add_argument('--repeat', type=int, default=3)
+    example.set_defaults(func=bench_example)
+
+    docs = sub.add_parser('docs', help="Поиск xs:documentation: спуск по потомкам и индекс за один проход")
+    docs.add_argument('--schema', default=EXAMPLE_LEAFTYPES)
+    docs.add_argument('--repeat', type=int, default=5)
+    docs.set_defaults(func=bench_docs)
+
+    phases = sub.add_parser('phases', help="Время фаз генерации на синтетических пакетах и на example/ "
+                                           "со сравнением с эталоном")
+    phases.add_argument('--files', type=int, nargs='+', default=[4, 16, 64], help="Число файлов в пакете (по шагам)")
+    phases.add_argument('--depth', type=int, default=3, help="Глубина цепочек xs:include")
+    phases.add_argument('--simple-types', type=int, default=40, help="Простых типов в файле (и столько же перечислений)")
+    phases.add_argument('--enum-values', type=int, default=8, help="Значений в перечислении")
+    phases.add_argument('--complex-types', type=int, default=20, help="Составных типов в файле")
+    phases.add_argument('--nesting', type=int, default=3, help="Глубина вложенности составных типов")
+    phases.add_argument('--elements', type=int, default=2, help="Глобальных элементов в файле")
+    phases.add_argument('--shared-types', type=int, default=0,
+                        help="Одинаковых перечислений, повторённых в каждом файле")
+    phases.add_argument('--no-example', dest='example', action='store_false', help="Не замерять example/")
+    phases.add_argument('--streaming', action='store_true', help="Потоковая запись DOCX")
+    phases.add_argument('--repeat', type=int, default=3)
+    phases.add_argument('--baseline', default=BASELINE_PATH, help="JSON-файл с эталонными замерами")
+    phases.add_argument('--save-baseline', action='store_true', help="Записать результаты как новый эталон")
+    phases.add_argument('--tolerance', type=float, default=0.3, help="Допустимое замедление фазы (доля)")
+    phases.set_defaults(func=bench_phases)
+
+    extract = sub.add_parser('extract', help="Разбор схемы через DOM и XPath и потоково через iterparse")
+    extract.add_argument('--schema', default=EXAMPLE_OBJECTS)
+    extract.add_argument('--synthetic', type=int, default=0,
+                         help="Дополнительно замерить синтетическую схему с таким числом типов каждого вида")
+    extract.add_argument('--repeat', type=int, default=3)
+    extract.set_defaults(func=bench_extract)
+
+    service = sub.add_parser('service', help="Задержка запроса к прогретой службе и отдельного запуска")
+    service.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1), help="Потоков службы")
+    service.add_argument('--clients', type=int, default=4, help="Одновременных запросов")
+    service.add_argument('--repeat', type=int, default=3)
+    service.set_defaults(func=bench_service)
+
+    fanout = sub.add_parser('fanout', help="Документ на каждое сообщение: отдельные запуски и --fan-out")
+    fanout.add_argument('--messages', type=int, default=8, help="Число сообщений с общими зависимостями")
+    fanout.add_argument('--workers', type=int, nargs='+', default=[1, max(2, os.cpu_count() or 1)])
+    fanout.set_defaults(func=bench_fanout)
+
+    prune = sub.add_parser('prune', help="Документ по example/ целиком и только по достижимым от ED503 компонентам")
+    prune.add_argument('--repeat', type=int, default=3)
+    prune.set_defaults(func=bench_prune)
+
+    tables = sub.add_parser('tables', help="Размер и время сохранения и открытия документа с большой таблицей")
+    tables.add_argument('--rows', type=int, default=50000)
+    tables.set_defaults(func=bench_tables)
+
+    volumes = sub.add_parser('volumes', help="Один документ и деление на тома по бюджету строк таблиц")
+    volumes.add_argument('--files', type=int, default=128)
+    volumes.add_argument('--rows', type=int, default=20000, help="Бюджет тома, строк таблиц")
+    volumes.add_argument('--streaming', action='store_true')
+    volumes.add_argument('--repeat', type=int, default=2)
+    volumes.set_defaults(func=bench_volumes)
+
+    formats = sub.add_parser('formats', help="Время вывода разделов в DOCX и в форматы предпросмотра (без загрузки схем)")
+    formats.add_argument('--files', type=int, default=64, help="Размер синтетического пакета (0 - только example/)")
+    formats.add_argument('--formats', nargs='+', default=['docx', 'md', 'html', 'json'])
+    formats.add_argument('--repeat', type=int, default=3)
+    formats.set_defaults(func=bench_formats)
+
+    render = sub.add_parser('render', help="Отрисовка разделов 4-7 в пуле процессов при разном числе процессов")
+    render.add_argument('--files', type=int, default=64)
+    render.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    render.add_argument('--streaming', action='store_true')
+    render.add_argument('--repeat', type=int, default=2)
+    render.set_defaults(func=bench_render)
+
+    startup = sub.add_parser('startup', help="Холодный старт: импорт модуля и разбор аргументов командной строки")
+    startup.add_argument('--repeat', type=int, default=5)
+    startup.set_defaults(func=bench_startup)
+
+    batch = sub.add_parser('batch', help="Пакетная генерация независимых наборов схем в пуле процессов")
+    batch.add_argument('--sets', type=int, default=8)
+    batch.add_argument('--files', type=int, default=4)
+    batch.add_argument('--jobs', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    batch.set_defaults(func=bench_batch)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
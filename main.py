@@ -1,413 +1,2155 @@
 import os
-import chardet
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import io
+import re
+import sys
+import glob
+import time
+import argparse
+import json
+import html
+import threading
+import contextlib
+import functools
+import codecs
+import hashlib
+import stat
+import copy
+import pickle
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from collections.abc import Mapping
+from typing import NamedTuple, Optional
 from lxml import etree
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
 import random
 import string
 
 NS = {'xs': 'http://www.w3.org/2001/XMLSchema'}
 
+GENERATOR_VERSION = '1.1'
+CACHE_FORMAT = 8
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MEMORY_CACHE_ENTRIES = 1024
+DEFAULT_SERVICE_PORT = 8765
+DEFAULT_EXAMPLE_MAX_DEPTH = 32
+# Меньше документов пул процессов не окупает: каждый процесс заново строит общие фрагменты и таблицы символов.
+FAN_OUT_POOL_MIN_JOBS = 4
+# Меньше фрагментов пул отрисовки не окупает: запуск процессов и передача генератора дороже самой отрисовки.
+RENDER_POOL_MIN_FRAGMENTS = 16
+# Методы генератора, вызовы которых подсчитываются при профилировании.
+PROFILED_METHODS = (
+    'add_row_to_table', 'generate_sample_value', 'find_complex_type', 'type_rows', 'generate_xml_example'
+)
+CHARDET_SAMPLE_BYTES = 64 * 1024
+
+XS_CHOICE = f"{{{NS['xs']}}}choice"
+XS_ANNOTATION = f"{{{NS['xs']}}}annotation"
+XS_DOCUMENTATION = f"{{{NS['xs']}}}documentation"
+XS_ELEMENT = f"{{{NS['xs']}}}element"
+XS_COMPLEX_TYPE = f"{{{NS['xs']}}}complexType"
+XS_SIMPLE_TYPE = f"{{{NS['xs']}}}simpleType"
+XS_INCLUDE = f"{{{NS['xs']}}}include"
+XS_IMPORT = f"{{{NS['xs']}}}import"
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W = {tag: f"{{{W_NS}}}{tag}" for tag in (
+    'tbl', 'tblPr', 'tblStyle', 'tblW', 'tblLayout', 'tblLook', 'tblGrid', 'gridCol', 'tr', 'tc', 'tcPr', 'tcW',
+    'shd', 'vAlign', 'p', 'pPr', 'jc', 'r', 'rPr', 'b', 'sz', 't', 'br', 'tab', 'val', 'type', 'w', 'fill',
+    'firstColumn', 'firstRow', 'lastColumn', 'lastRow', 'noHBand', 'noVBand', 'sectPr', 'body', 'pStyle',
+    'rFonts', 'ascii', 'hAnsi', 'i', 'style', 'styleId'
+)}
+W_XMLNS = f' xmlns:w="{W_NS}"'.encode('ascii')
+FRAGMENT_TAG_RE = re.compile(rb'<w:\w+')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+# Оформление таблиц задаётся именованными стилями: заливка шапки - условным форматированием первой строки
+# стиля таблицы, выравнивание и шрифт - стилями абзацев. В ячейках остаются только ссылки на стили.
+TABLE_STYLE = 'XsdTable'
+TABLE_HEADER_STYLE = 'XsdTableHeader'
+TABLE_TEXT_STYLE = 'XsdTableText'
+TABLE_STYLES_XML = f'''<w:styles xmlns:w="{W_NS}">
+<w:style w:type="table" w:customStyle="1" w:styleId="{TABLE_STYLE}">
+<w:name w:val="XSD Table"/><w:basedOn w:val="TableGrid"/><w:uiPriority w:val="59"/>
+<w:tcPr><w:vAlign w:val="center"/></w:tcPr>
+<w:tblStylePr w:type="firstRow">
+<w:tcPr><w:shd w:val="clear" w:color="auto" w:fill="D9D9D9"/><w:vAlign w:val="top"/></w:tcPr>
+</w:tblStylePr>
+</w:style>
+<w:style w:type="paragraph" w:customStyle="1" w:styleId="{TABLE_HEADER_STYLE}">
+<w:name w:val="XSD Table Header"/><w:basedOn w:val="Normal"/><w:qFormat/>
+<w:pPr><w:jc w:val="center"/></w:pPr><w:rPr><w:b/></w:rPr>
+</w:style>
+<w:style w:type="paragraph" w:customStyle="1" w:styleId="{TABLE_TEXT_STYLE}">
+<w:name w:val="XSD Table Text"/><w:basedOn w:val="Normal"/><w:qFormat/>
+<w:pPr><w:jc w:val="left"/></w:pPr><w:rPr><w:sz w:val="20"/></w:rPr>
+</w:style>
+</w:styles>'''
+# Ширина текстовой области шаблона python-docx (Letter, поля по 1") в twips.
+BLOCK_WIDTH_TWIPS = 8640
+TWIPS_PER_INCH = 1440
+RUN_BREAK_RE = re.compile(r'(\r\n|\n|\r|\t)')
+# Разделы словаря типов (раздел 6) и встроенные типы XSD, которые в них попадают.
+DATA_TYPE_SECTIONS = (
+    ('string', '6.1. Строковые типы (string)'),
+    ('decimal', '6.2. Десятичные типы (decimal)'),
+    ('integer', '6.3. Целочисленные типы (int)'),
+    ('datetime', '6.4. Типы даты и времени (date и dateTime)'),
+    ('other', '6.5. Остальные типы'),
+)
+# Шаги разделов 1-7; в режиме томов раздел выводится только в томах, куда попали его фрагменты.
+SECTION_STEPS = {
+    'add_terms': '1', 'add_general_provisions': '2', 'add_documents_list': '3', 'add_xml_structures': '4',
+    'add_enum_codes': '5', 'add_data_types_section': '6', 'add_xml_examples': '7',
+}
+BUILTIN_CATEGORIES = {
+    **dict.fromkeys(('string', 'normalizedString', 'token', 'language', 'Name', 'NCName', 'NMTOKEN', 'NMTOKENS',
+                     'ID', 'IDREF', 'IDREFS', 'ENTITY', 'ENTITIES'), 'string'),
+    'decimal': 'decimal',
+    **dict.fromkeys(('integer', 'int', 'long', 'short', 'byte', 'nonNegativeInteger', 'positiveInteger',
+                     'nonPositiveInteger', 'negativeInteger', 'unsignedLong', 'unsignedInt', 'unsignedShort',
+                     'unsignedByte'), 'integer'),
+    **dict.fromkeys(('date', 'dateTime', 'dateTimeStamp', 'time'), 'datetime'),
+}
+# Допустимые значения целочисленных встроенных типов; без верхней или нижней границы пример берётся из int.
+INTEGER_RANGES = {
+    'int': (-2147483648, 2147483647), 'integer': (-2147483648, 2147483647), 'long': (-2147483648, 2147483647),
+    'short': (-32768, 32767), 'byte': (-128, 127),
+    'nonNegativeInteger': (0, 2147483647), 'positiveInteger': (1, 2147483647),
+    'nonPositiveInteger': (-2147483648, 0), 'negativeInteger': (-2147483648, -1),
+    'unsignedLong': (0, 2147483647), 'unsignedInt': (0, 2147483647), 'unsignedShort': (0, 65535),
+    'unsignedByte': (0, 255),
+}
+FACETS = (
+    'minLength', 'maxLength', 'minInclusive', 'maxInclusive',
+    'minExclusive', 'maxExclusive', 'pattern', 'totalDigits',
+    'fractionDigits'
+)
+
+XML_DECLARATION_RE = re.compile(rb'^<\?xml\s[^>]*?encoding\s*=\s*["\']([A-Za-z][A-Za-z0-9._-]*)["\']')
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'UTF-32LE'),
+    (codecs.BOM_UTF32_BE, 'UTF-32BE'),
+    (codecs.BOM_UTF8, 'UTF-8'),
+    (codecs.BOM_UTF16_LE, 'UTF-16LE'),
+    (codecs.BOM_UTF16_BE, 'UTF-16BE'),
+]
+
 
 def resolve_path(schema_location, parent_file):
     parent_dir = os.path.dirname(parent_file)
     return os.path.normpath(os.path.join(parent_dir, schema_location))
 
 
-def get_doc(node):
-    if node is None:
-        return ""
-    doc = node.find('.//xs:annotation/xs:documentation[1]', namespaces=NS)
-    if doc is None:
-        doc = node.find('.//xs:annotation/xs:documentation', namespaces=NS)
-    text_content = ""
-    if doc is not None:
-        text_content = (doc.text or "")
-        for child in doc:
-            text_content += etree.tostring(child, encoding='unicode', method='text') or ""
-            text_content += (child.tail or "")
-        text_content += (doc.tail or "")
+def is_schema_archive(source):
+    # Пакет схем - отображение «имя -> содержимое», файловый объект с ZIP или путь к ZIP-архиву.
+    if isinstance(source, Mapping) or hasattr(source, 'read'):
+        return True
+    return isinstance(source, (str, os.PathLike)) and os.fspath(source).lower().endswith('.zip')
+
+
+def read_schema_archive(source):
+    # Виртуальные пути и содержимое всех XSD пакета. Члены ZIP-архива читаются за одно открытие
+    # и получают пути вида <архив>/<имя в архиве>, так что include разрешается внутри архива.
+    if isinstance(source, Mapping):
+        return {os.path.normpath(name): bytes(data) for name, data in source.items()}
+    prefix = '' if hasattr(source, 'read') else os.path.normpath(os.fspath(source))
+    files = {}
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and info.filename.lower().endswith('.xsd'):
+                files[os.path.normpath(os.path.join(prefix, info.filename))] = archive.read(info)
+    return files
+
+
+def decodes_as(raw_data, encoding):
+    try:
+        codecs.lookup(encoding)
+        raw_data.decode(encoding)
+    except (LookupError, UnicodeDecodeError):
+        return False
+    return True
+
+
+def detect_encoding(raw_data):
+    for bom, encoding in BOMS:
+        if raw_data.startswith(bom):
+            return encoding
+
+    match = XML_DECLARATION_RE.match(raw_data)
+    if match:
+        encoding = match.group(1).decode('ascii')
+        if decodes_as(raw_data, encoding):
+            return encoding
+    elif decodes_as(raw_data, 'utf-8'):
+        return 'utf-8'
+
+    import chardet
+    detected = chardet.detect(raw_data[:CHARDET_SAMPLE_BYTES])
+    encoding = detected['encoding']
+    if encoding is None or encoding.lower() in ('ascii', 'utf-8', 'utf-8-sig'):
+        encoding = 'utf-8'
+    return encoding
+
+
+def scan_schema_locations(raw_data):
+    # xs:include и xs:import по спецификации XSD идут в начале схемы, поэтому разбор
+    # останавливается на первом компоненте верхнего уровня, не читая остальной файл.
+    parser_source = io.BytesIO(raw_data)
+    locations = []
+    context = etree.iterparse(parser_source, events=('start',), encoding=detect_encoding(raw_data), recover=True)
+    root = None
+    for _, elem in context:
+        if root is None:
+            root = elem
+            continue
+        if elem.getparent() is not root:
+            continue
+        if elem.tag in (XS_INCLUDE, XS_IMPORT):
+            loc = elem.get('schemaLocation')
+            if loc:
+                locations.append(loc)
+        elif elem.tag != XS_ANNOTATION:
+            break
+    return locations
+
+
+def append_run_text(r, text):
+    for part in RUN_BREAK_RE.split(text):
+        if not part:
+            continue
+        if part == '\t':
+            etree.SubElement(r, W['tab'])
+        elif part in ('\n', '\r', '\r\n'):
+            etree.SubElement(r, W['br'])
+        else:
+            t = etree.SubElement(r, W['t'])
+            t.text = part
+            if part[0].isspace() or part[-1].isspace():
+                t.set(XML_SPACE, 'preserve')
+
+
+class TableBuilder:
+    def __init__(self, headers, widths=None, autofit=True):
+        self.headers = headers
+        self.cols = len(headers)
+        self.autofit = autofit
+        self.col_widths = [BLOCK_WIDTH_TWIPS // self.cols] * self.cols
+        if widths:
+            for i, width in enumerate(widths[:self.cols]):
+                self.col_widths[i] = int(width)
+
+        # Свойства ячеек одинаковы для всех строк столбца, поэтому собираются один раз и копируются;
+        # остальное оформление берётся из стилей TABLE_STYLES_XML.
+        self.tc_prs = []
+        for width in self.col_widths:
+            tc_pr = etree.Element(W['tcPr'])
+            tc_w = etree.SubElement(tc_pr, W['tcW'])
+            tc_w.set(W['type'], 'dxa')
+            tc_w.set(W['w'], str(width))
+            self.tc_prs.append(tc_pr)
+
+        self.header_p_pr = etree.Element(W['pPr'])
+        etree.SubElement(self.header_p_pr, W['pStyle']).set(W['val'], TABLE_HEADER_STYLE)
+        self.text_p_pr = etree.Element(W['pPr'])
+        etree.SubElement(self.text_p_pr, W['pStyle']).set(W['val'], TABLE_TEXT_STYLE)
+
+    def shell(self):
+        tbl = etree.Element(W['tbl'], nsmap={'w': W_NS})
+        tbl_pr = etree.SubElement(tbl, W['tblPr'])
+        etree.SubElement(tbl_pr, W['tblStyle']).set(W['val'], TABLE_STYLE)
+        tbl_w = etree.SubElement(tbl_pr, W['tblW'])
+        tbl_w.set(W['type'], 'auto')
+        tbl_w.set(W['w'], '0')
+        if not self.autofit:
+            etree.SubElement(tbl_pr, W['tblLayout']).set(W['type'], 'fixed')
+        look = etree.SubElement(tbl_pr, W['tblLook'])
+        for attr, value in (('firstColumn', '1'), ('firstRow', '1'), ('lastColumn', '0'), ('lastRow', '0'),
+                            ('noHBand', '0'), ('noVBand', '1'), ('val', '04A0')):
+            look.set(W[attr], value)
+        grid = etree.SubElement(tbl, W['tblGrid'])
+        for width in self.col_widths:
+            etree.SubElement(grid, W['gridCol']).set(W['w'], str(width))
+
+        tr = etree.SubElement(tbl, W['tr'])
+        for i, header in enumerate(self.headers):
+            tc = etree.SubElement(tr, W['tc'])
+            tc.append(copy.deepcopy(self.tc_prs[i]))
+            p = etree.SubElement(tc, W['p'])
+            p.append(copy.deepcopy(self.header_p_pr))
+            r = etree.SubElement(p, W['r'])
+            append_run_text(r, header)
+        return tbl
+
+    def row(self, values):
+        tr = etree.Element(W['tr'], nsmap={'w': W_NS})
+        for i in range(self.cols):
+            tc = etree.SubElement(tr, W['tc'])
+            tc.append(copy.deepcopy(self.tc_prs[i]))
+            p = etree.SubElement(tc, W['p'])
+            p.append(copy.deepcopy(self.text_p_pr))
+            text = values[i] if i < len(values) else None
+            cell_text = str(text) if text is not None else ""
+            if cell_text:
+                r = etree.SubElement(p, W['r'])
+                append_run_text(r, cell_text)
+        return tr
+
+
+def build_table(headers, rows, widths=None, autofit=True):
+    builder = TableBuilder(headers, widths, autofit)
+    tbl = builder.shell()
+    for values in rows:
+        tbl.append(builder.row(values))
+    return tbl
+
+
+def serialize_fragment(element):
+    # Пространство имён w объявлено в корне word/document.xml, повторять его в каждом фрагменте не нужно.
+    return etree.tostring(element, encoding='utf-8').replace(W_XMLNS, b'', 1)
+
+
+def table_chunks(headers, rows, widths=None, autofit=True):
+    # Таблица сериализуется построчно, не собирая w:tbl целиком в памяти.
+    builder = TableBuilder(headers, widths, autofit)
+    tbl = builder.shell()
+    tbl.append(etree.Comment('rows'))
+    head, tail = serialize_fragment(tbl).split(b'<!--rows-->')
+    yield head
+    for values in rows:
+        yield serialize_fragment(builder.row(values))
+    yield tail
+
+
+def make_paragraph(text='', style=None, align=None, italic=False, font=None, size=None):
+    p = etree.Element(W['p'], nsmap={'w': W_NS})
+    if style or align:
+        p_pr = etree.SubElement(p, W['pPr'])
+        if style:
+            etree.SubElement(p_pr, W['pStyle']).set(W['val'], style)
+        if align:
+            etree.SubElement(p_pr, W['jc']).set(W['val'], align)
+    if text:
+        r = etree.SubElement(p, W['r'])
+        if italic or font or size:
+            r_pr = etree.SubElement(r, W['rPr'])
+            if font:
+                fonts = etree.SubElement(r_pr, W['rFonts'])
+                fonts.set(W['ascii'], font)
+                fonts.set(W['hAnsi'], font)
+            if italic:
+                etree.SubElement(r_pr, W['i'])
+            if size:
+                etree.SubElement(r_pr, W['sz']).set(W['val'], str(size * 2))
+        append_run_text(r, text)
+    return p
+
+
+def inches(value):
+    return round(value * TWIPS_PER_INCH)
+
+
+def make_page_break():
+    p = etree.Element(W['p'], nsmap={'w': W_NS})
+    r = etree.SubElement(p, W['r'])
+    etree.SubElement(r, W['br']).set(W['type'], 'page')
+    return p
+
+
+def default_template_path():
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+
+
+def add_table_styles(styles):
+    # Стили, уже определённые в шаблоне (--template), не заменяются: так оформление таблиц можно переопределить.
+    present = {style.get(W['styleId']) for style in styles.iterfind(W['style'])}
+    for style in etree.fromstring(TABLE_STYLES_XML, etree.XMLParser(remove_blank_text=True)):
+        if style.get(W['styleId']) not in present:
+            styles.append(style)
+
+
+class BodyWriter:
+    # Фрагменты кэша (см. render_fragment) хранятся как XML тела документа Word.
+    supports_fragments = True
+
+    def write(self, element):
+        raise NotImplementedError
+
+    def add_heading(self, text, level=1, align=None):
+        style = 'Title' if level == 0 else f'Heading{level}'
+        self.write(make_paragraph(text, style=style, align=align))
+
+    def add_paragraph(self, text='', style=None, italic=False):
+        self.write(make_paragraph(text, style=style, italic=italic))
+
+    def add_code(self, text):
+        self.write(make_paragraph(text, font='Courier New', size=10))
+
+    def add_page_break(self):
+        self.write(make_page_break())
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        self.write(build_table(headers, rows, widths, autofit))
+
+    def write_fragment(self, fragment):
+        # Каждый элемент разбирается отдельно с собственным объявлением w: перенос узлов,
+        # ссылающихся на объявление во внешней обёртке, стоит в lxml квадратично от их числа.
+        for data in fragment:
+            tag_end = FRAGMENT_TAG_RE.match(data).end()
+            self.write(etree.fromstring(data[:tag_end] + W_XMLNS + data[tag_end:]))
+
+
+class NullWriter(BodyWriter):
+    # Проход планирования: разделы выполняются, но ничего не выводят.
+    def write(self, element):
+        pass
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        pass
+
+
+class FragmentWriter(BodyWriter):
+    # Собирает вывод раздела в список сериализованных элементов тела для кэша фрагментов.
+    def __init__(self):
+        self.fragment = []
+
+    def write(self, element):
+        self.fragment.append(serialize_fragment(element))
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        self.fragment.append(b''.join(table_chunks(headers, rows, widths, autofit)))
+
+    def write_fragment(self, fragment):
+        self.fragment.extend(fragment)
+
+
+class DocxWriter(BodyWriter):
+    def __init__(self, output_path, template_path=None):
+        from docx import Document
+        self.output_path = output_path
+        self.doc = Document(template_path)
+        add_table_styles(self.doc.styles.element)
+        self.sect_pr = self.doc.element.body.find(W['sectPr'])
+
+    def write(self, element):
+        self.sect_pr.addprevious(element)
+
+    def close(self):
+        self.doc.save(self.output_path)
+
+    def abort(self):
+        pass
+
+
+class StreamingDocxWriter(BodyWriter):
+    # word/document.xml пишется в архив потоком: каждый абзац и таблица сериализуются сразу
+    # после построения, а стили (с добавленными стилями таблиц), нумерация и настройки копируются из шаблона.
+    def __init__(self, output_path, template_path=None):
+        self.output_path = output_path
+        with zipfile.ZipFile(template_path or default_template_path()) as template:
+            document_xml = template.read('word/document.xml')
+            self.zip = zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED)
+            for info in template.infolist():
+                if info.filename == 'word/styles.xml':
+                    styles = etree.fromstring(template.read(info))
+                    add_table_styles(styles)
+                    self.zip.writestr(info.filename, etree.tostring(styles, xml_declaration=True, encoding='UTF-8',
+                                                                    standalone=True), zipfile.ZIP_DEFLATED)
+                elif info.filename != 'word/document.xml':
+                    self.zip.writestr(info.filename, template.read(info), zipfile.ZIP_DEFLATED)
+
+        root = etree.fromstring(document_xml)
+        body = root.find(W['body'])
+        sect_pr = body.find(W['sectPr'])
+        for child in list(body):
+            body.remove(child)
+        body.append(etree.Comment('body'))
+        head, tail = etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True).split(b'<!--body-->')
+        self.tail = (etree.tostring(sect_pr, encoding='utf-8') if sect_pr is not None else b'') + tail
+
+        self.stream = self.zip.open('word/document.xml', 'w', force_zip64=True)
+        self.stream.write(head)
+
+    def write(self, element):
+        self.stream.write(serialize_fragment(element))
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        for chunk in table_chunks(headers, rows, widths, autofit):
+            self.stream.write(chunk)
+
+    def write_fragment(self, fragment):
+        for data in fragment:
+            self.stream.write(data)
+
+    def close(self):
+        self.stream.write(self.tail)
+        self.stream.close()
+        self.zip.close()
+
+    def abort(self):
+        try:
+            self.stream.close()
+            self.zip.close()
+        finally:
+            if os.path.exists(self.output_path):
+                os.remove(self.output_path)
+
+
+def cell_text(value):
+    return str(value) if value is not None else ""
+
+
+class TextWriter:
+    # Предпросмотр без python-docx: те же вызовы разделов, вывод сразу пишется в текстовый файл.
+    supports_fragments = False
+
+    def __init__(self, output_path, template_path=None):
+        self.output_path = output_path
+        self.stream = open(output_path, 'w', encoding='utf-8', newline='\n')
+        self.write_head()
+
+    def write_head(self):
+        pass
+
+    def write_tail(self):
+        pass
+
+    def add_page_break(self):
+        pass
+
+    def close(self):
+        self.write_tail()
+        self.stream.close()
+
+    def abort(self):
+        try:
+            self.stream.close()
+        finally:
+            if os.path.exists(self.output_path):
+                os.remove(self.output_path)
+
+
+# Подчёркивание внутри слова (cbr_ed503) разметкой не считается и не экранируется.
+MARKDOWN_SPECIAL_RE = re.compile(r'[\\`*\[\]<>|]|(?<!\w)_|_(?!\w)')
+
+
+def markdown_escape(text):
+    return MARKDOWN_SPECIAL_RE.sub(lambda m: '\\' + m.group(), text).replace('\r\n', '\n').replace('\n', '<br>')
+
+
+class MarkdownWriter(TextWriter):
+    def __init__(self, output_path, template_path=None):
+        self.in_list = False
+        super().__init__(output_path, template_path)
+
+    def block(self, text):
+        if self.in_list:
+            self.stream.write('\n')
+            self.in_list = False
+        self.stream.write(text)
+        self.stream.write('\n\n')
+
+    def add_heading(self, text, level=1, align=None):
+        self.block('#' * (level + 1) + ' ' + markdown_escape(text))
+
+    def add_paragraph(self, text='', style=None, italic=False):
+        if not text:
+            return
+        if style == 'ListNumber':
+            self.stream.write(f"- {markdown_escape(text)}\n")
+            self.in_list = True
+            return
+        text = markdown_escape(text)
+        self.block(f"*{text}*" if italic else text)
+
+    def add_code(self, text):
+        self.block(f"```xml\n{text}\n```")
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        if self.in_list:
+            self.stream.write('\n')
+            self.in_list = False
+        write = self.stream.write
+        write('| ' + ' | '.join(markdown_escape(h) for h in headers) + ' |\n')
+        write('|' + '---|' * len(headers) + '\n')
+        cols = len(headers)
+        for values in rows:
+            cells = [markdown_escape(cell_text(values[i] if i < len(values) else None)) for i in range(cols)]
+            write('| ' + ' | '.join(cells) + ' |\n')
+        write('\n')
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>Описание форматов электронных документов</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #999; padding: 2px 6px; vertical-align: top; font-size: 10pt; }
+th { background: #d9d9d9; }
+pre { background: #f4f4f4; padding: 1em; }
+</style>
+</head>
+<body>
+"""
+
+
+def html_text(text):
+    return html.escape(text).replace('\r\n', '\n').replace('\n', '<br>')
+
+
+class HtmlWriter(TextWriter):
+    def write_head(self):
+        self.stream.write(HTML_HEAD)
+
+    def write_tail(self):
+        self.stream.write('</body>\n</html>\n')
+
+    def add_heading(self, text, level=1, align=None):
+        tag = f"h{min(level + 1, 6)}"
+        self.stream.write(f"<{tag}>{html_text(text)}</{tag}>\n")
+
+    def add_paragraph(self, text='', style=None, italic=False):
+        if not text:
+            return
+        text = html_text(text)
+        self.stream.write(f"<p><i>{text}</i></p>\n" if italic else f"<p>{text}</p>\n")
+
+    def add_code(self, text):
+        self.stream.write(f"<pre><code>{html.escape(text)}</code></pre>\n")
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        write = self.stream.write
+        write('<table>\n<thead><tr>' + ''.join(f"<th>{html_text(h)}</th>" for h in headers) + '</tr></thead>\n<tbody>\n')
+        cols = len(headers)
+        for values in rows:
+            write('<tr>' + ''.join(f"<td>{html_text(cell_text(values[i] if i < len(values) else None))}</td>"
+                                   for i in range(cols)) + '</tr>\n')
+        write('</tbody>\n</table>\n')
+
+
+class JsonWriter(TextWriter):
+    # Массив блоков, по одному блоку (и по одной строке таблицы) на строку файла - так вывод
+    # удобно сравнивать построчно в системе контроля версий.
+    def write_head(self):
+        self.stream.write('[')
+        self.first = True
+
+    def write_tail(self):
+        self.stream.write('\n]\n')
+
+    def begin_block(self):
+        self.stream.write('\n' if self.first else ',\n')
+        self.first = False
+
+    def add_block(self, block):
+        self.begin_block()
+        self.stream.write(json.dumps(block, ensure_ascii=False))
+
+    def add_heading(self, text, level=1, align=None):
+        self.add_block({'type': 'heading', 'level': level, 'text': text})
+
+    def add_paragraph(self, text='', style=None, italic=False):
+        if not text:
+            return
+        block = {'type': 'paragraph', 'text': text}
+        if style:
+            block['style'] = style
+        if italic:
+            block['italic'] = True
+        self.add_block(block)
+
+    def add_code(self, text):
+        self.add_block({'type': 'code', 'language': 'xml', 'text': text})
+
+    def add_table(self, headers, rows, widths=None, autofit=True):
+        self.begin_block()
+        write = self.stream.write
+        write('{"type": "table", "headers": ' + json.dumps(headers, ensure_ascii=False) + ', "rows": [')
+        cols = len(headers)
+        separator = '\n'
+        for values in rows:
+            write(separator + json.dumps([cell_text(values[i] if i < len(values) else None) for i in range(cols)],
+                                         ensure_ascii=False))
+            separator = ',\n'
+        write(']}')
+
+
+OUTPUT_WRITERS = {
+    'docx': DocxWriter,
+    'md': MarkdownWriter,
+    'html': HtmlWriter,
+    'json': JsonWriter,
+}
+OUTPUT_EXTENSIONS = {'.md': 'md', '.markdown': 'md', '.html': 'html', '.htm': 'html', '.json': 'json'}
+
+
+def output_format_for(output_path):
+    return OUTPUT_EXTENSIONS.get(os.path.splitext(output_path)[1].lower(), 'docx')
+
+
+def documentation_text(doc):
+    text_content = (doc.text or "")
+    for child in doc:
+        text_content += etree.tostring(child, encoding='unicode', method='text') or ""
+        text_content += (child.tail or "")
+    text_content += (doc.tail or "")
     return text_content.strip().replace('\n', ' ').replace('\r', ' ')
 
 
+def build_doc_index(root):
+    # Один проход по всем xs:documentation: каждому компоненту сопоставляется первый
+    # xs:documentation его собственной xs:annotation, а не вложенных компонентов.
+    index = {}
+    for doc in root.iter(XS_DOCUMENTATION):
+        annotation = doc.getparent()
+        if annotation is None or annotation.tag != XS_ANNOTATION:
+            continue
+        component = annotation.getparent()
+        if component is None or component in index:
+            continue
+        index[component] = documentation_text(doc)
+    return index
+
+
+class EnumValue(NamedTuple):
+    code: str
+    description: str
+
+
+class Derivation(NamedTuple):
+    # builtin - встроенный тип XSD в конце цепочки xs:restriction (None, если цепочка оборвалась
+    # на неизвестном типе base); facets - ограничения с учётом унаследованных от базовых типов.
+    builtin: Optional[str]
+    base: str
+    facets: dict
+
+
+@dataclass(slots=True)
+class SimpleTypeRecord:
+    name: str
+    file: str
+    base_type: str
+    restrictions: dict
+    description: str
+    is_enum: bool
+    # Отпечаток содержимого (база, ограничения, описание, значения перечисления): одинаковые
+    # определения из разных файлов объединяются при слиянии схем.
+    fingerprint: str = ""
+
+
+@dataclass(slots=True)
+class InternedType:
+    record: SimpleTypeRecord
+    values: list
+    files: list
+
+
+@dataclass(slots=True)
+class Volume:
+    number: int
+    output_path: str
+    rows: int = 0
+    size: int = 0
+    fragments: int = 0
+
+
+def volume_output_path(output_path, number):
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{number}{ext}"
+
+
+def type_fingerprint(base_type, restrictions, description, values):
+    content = (base_type, sorted(restrictions.items()), description, [tuple(v) for v in values])
+    return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
+
+
+@dataclass(slots=True)
+class AttributeRecord:
+    name: str
+    type: str
+    use: str
+
+
+@dataclass(slots=True)
+class ElementRecord:
+    name: Optional[str]
+    ref: Optional[str]
+    type: Optional[str]
+    min_occurs: str
+    max_occurs: str
+    in_choice: bool
+    doc: str
+    complex_type: Optional['ComplexTypeRecord'] = None
+
+
+@dataclass(slots=True)
+class ExtensionRecord:
+    base: Optional[str]
+    elements: list
+
+
+@dataclass(slots=True)
+class ComplexTypeRecord:
+    name: Optional[str]
+    doc: str
+    # Элементы первого xs:sequence/xs:all — строки таблицы раздела 4.
+    elements: list = field(default_factory=list)
+    # Элементы всех вложенных xs:sequence/xs:all и все xs:attribute — для примеров XML.
+    all_elements: list = field(default_factory=list)
+    attributes: list = field(default_factory=list)
+    extension: Optional[ExtensionRecord] = None
+
+
+@dataclass(slots=True)
+class ContentModel:
+    # Пары (запись, схема-владелец) с учётом всей цепочки xs:extension.
+    attributes: list = field(default_factory=list)
+    elements: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SchemaRecord:
+    name: str
+    doc: str
+    target_namespace: Optional[str]
+    nsmap: dict
+    first_element_name: str
+    first_element_doc: str
+    simple_types: list
+    enum_types: dict
+    includes: list
+    complex_types: dict
+    global_elements: list
+    # Подмножество includes, подключённое через xs:include (а не xs:import).
+    included: list = field(default_factory=list)
+
+
+def extract_element(elem, memo, docs):
+    record = memo.get(elem)
+    if record is not None:
+        return record
+
+    parent = elem.getparent()
+    record = ElementRecord(
+        name=elem.get('name'),
+        ref=elem.get('ref'),
+        type=elem.get('type'),
+        min_occurs=elem.get('minOccurs', '1'),
+        max_occurs=elem.get('maxOccurs', '1'),
+        in_choice=parent is not None and parent.tag == XS_CHOICE,
+        doc=docs.get(elem, "")
+    )
+    memo[elem] = record
+
+    complex_type = elem.find('xs:complexType', namespaces=NS)
+    if complex_type is not None:
+        record.complex_type = extract_complex_type(complex_type, memo, docs)
+    return record
+
+
+def extract_complex_type(node, memo, docs):
+    record = memo.get(node)
+    if record is not None:
+        return record
+
+    record = ComplexTypeRecord(name=node.get('name'), doc=docs.get(node, ""))
+    memo[node] = record
+
+    seq_all = node.xpath('.//xs:sequence | .//xs:all', namespaces=NS)
+    for i, seq in enumerate(seq_all):
+        for elem in seq.xpath('xs:element', namespaces=NS):
+            elem_record = extract_element(elem, memo, docs)
+            record.all_elements.append(elem_record)
+            if i == 0:
+                record.elements.append(elem_record)
+
+    for attr in node.xpath('.//xs:attribute', namespaces=NS):
+        aname = attr.get('name')
+        if aname:
+            record.attributes.append(AttributeRecord(aname, attr.get('type', 'string'), attr.get('use', 'optional')))
+
+    extension = node.find('.//xs:extension', namespaces=NS)
+    if extension is not None:
+        ext_elements = []
+        for seq in extension.xpath('xs:sequence | xs:all', namespaces=NS):
+            for elem in seq.xpath('xs:element', namespaces=NS):
+                ext_elements.append(extract_element(elem, memo, docs))
+        record.extension = ExtensionRecord(extension.get('base'), ext_elements)
+    return record
+
+
+def extract_simple_type(node, schema_name, docs):
+    name = node.get('name')
+    enumerations = node.xpath('.//xs:enumeration', namespaces=NS)
+    is_enum = len(enumerations) > 0
+
+    base_type = ""
+    restrictions = {}
+    restriction_elem = node.find('.//xs:restriction', namespaces=NS)
+    if restriction_elem is not None:
+        base_type = restriction_elem.get('base', '')
+        for facet in restriction_elem:
+            tag = str(facet.tag)
+            if tag.startswith(f"{{{NS['xs']}}}"):
+                facet_name = tag[len(f"{{{NS['xs']}}}"):]
+                if facet_name in FACETS:
+                    restrictions[facet_name] = facet.get('value', '')
+
+    enum_values = []
+    for enum in enumerations:
+        code = enum.get('value')
+        desc = docs.get(enum, "")
+        if not desc:
+            desc = code
+        enum_values.append(EnumValue(code, desc))
+
+    description = docs.get(node, "")
+    record = SimpleTypeRecord(
+        name=name,
+        file=schema_name,
+        base_type=base_type,
+        restrictions=restrictions,
+        description=description,
+        is_enum=is_enum,
+        fingerprint=type_fingerprint(base_type, restrictions, description, enum_values)
+    )
+    return record, enum_values
+
+
+def schema_name_for(file_path):
+    schema_name = os.path.basename(file_path)
+    if schema_name.lower().endswith('.xsd'):
+        schema_name = schema_name[:-4]
+    return schema_name
+
+
+def split_qname(qname):
+    if ':' in qname:
+        prefix, local = qname.split(':', 1)
+        return prefix, local
+    return None, qname
+
+
+class SymbolTable:
+    def __init__(self, schemas):
+        self.simple_types = {}
+        self.complex_types = {}
+        self.enums = {}
+        self.elements = {}
+        self.schemas = {}
+        self.namespaces = {}
+        self.local_simple_types = {}
+        self.local_complex_types = {}
+        self.local_enums = {}
+        self.local_elements = {}
+        self.derivations = {}
+        self.resolving = set()
+
+        for path, schema in schemas.items():
+            self.namespaces[id(schema)] = schema.target_namespace
+        # Схема без targetNamespace, подключённая через xs:include, получает пространство имён включающей схемы.
+        for path, schema in schemas.items():
+            for loc in schema.included:
+                included = schemas.get(resolve_path(loc, path))
+                if included is not None and included.target_namespace is None:
+                    self.namespaces[id(included)] = self.namespaces[id(schema)]
+
+        for path, schema in schemas.items():
+            ns = self.namespaces[id(schema)]
+            self.schemas.setdefault(schema.name, schema)
+            for st in schema.simple_types:
+                self.simple_types.setdefault((ns, st.name), (st, schema))
+                self.local_simple_types.setdefault(st.name, (st, schema))
+            for name, values in schema.enum_types.items():
+                self.enums.setdefault((ns, name), values)
+                self.local_enums.setdefault(name, values)
+            for name, ct in schema.complex_types.items():
+                self.complex_types.setdefault((ns, name), (ct, schema))
+                self.local_complex_types.setdefault(name, (ct, schema))
+            for elem in schema.global_elements:
+                self.elements.setdefault((ns, elem.name), (elem, schema))
+                self.local_elements.setdefault(elem.name, (elem, schema))
+
+    def resolve(self, qname, schema):
+        prefix, local = split_qname(qname)
+        if schema is None:
+            return None, local
+        return schema.nsmap.get(prefix), local
+
+    def lookup(self, table, local_table, qname, schema):
+        key = self.resolve(qname, schema)
+        found = table.get(key)
+        if found is None and key[0] != NS['xs']:
+            found = local_table.get(key[1])
+        return found
+
+    def simple_type(self, qname, schema):
+        return self.lookup(self.simple_types, self.local_simple_types, qname, schema) or (None, None)
+
+    def complex_type(self, qname, schema):
+        return self.lookup(self.complex_types, self.local_complex_types, qname, schema) or (None, None)
+
+    def enum(self, qname, schema):
+        return self.lookup(self.enums, self.local_enums, qname, schema)
+
+    def element(self, qname, schema):
+        return self.lookup(self.elements, self.local_elements, qname, schema) or (None, None)
+
+    def derivation(self, st, schema):
+        key = id(st)
+        found = self.derivations.get(key)
+        if found is not None:
+            return found
+        if key in self.resolving:
+            # Циклическая цепочка base: дальше не идём.
+            return Derivation(None, st.base_type, dict(st.restrictions))
+
+        self.resolving.add(key)
+        try:
+            base = st.base_type
+            ns, local = self.resolve(base, schema) if base else (None, '')
+            base_st, base_schema = self.simple_type(base, schema) if base and ns != NS['xs'] else (None, None)
+            if ns == NS['xs']:
+                result = Derivation(local, base, dict(st.restrictions))
+            elif base_st is None:
+                result = Derivation(None, base, dict(st.restrictions))
+            else:
+                parent = self.derivation(base_st, base_schema)
+                facets = dict(parent.facets)
+                facets.update(st.restrictions)
+                result = Derivation(parent.builtin, parent.base, facets)
+        finally:
+            self.resolving.discard(key)
+        self.derivations[key] = result
+        return result
+
+
+def type_category(derivation):
+    if derivation.builtin is not None:
+        return BUILTIN_CATEGORIES.get(derivation.builtin, 'other')
+    # Цепочка не дошла до встроенного типа (например, не загружена схема с базовым типом):
+    # раздел угадывается по имени последнего известного базового типа.
+    base_type = derivation.base.lower()
+    if 'string' in base_type:
+        return 'string'
+    if 'decimal' in base_type:
+        return 'decimal'
+    if any(t in base_type for t in ['int', 'integer', 'long', 'short', 'byte']):
+        return 'integer'
+    if any(t in base_type for t in ['date', 'time']):
+        return 'datetime'
+    return 'other'
+
+
+SIMPLE_PATTERN_RE = re.compile(r'(\\d|\[(?:[^\]\\]|\\.)+\])\{(\d+)(?:,(\d*))?\}')
+
+
+def pattern_sample(pattern, rng):
+    # Образец для шаблона вида \d{10} или [0-9A-Z]{11}: одного класса символов с числом повторений.
+    # Для остальных шаблонов возвращается None, и значение подбирается по прежним эвристикам.
+    match = SIMPLE_PATTERN_RE.fullmatch(pattern)
+    if match is None:
+        return None
+    chars_class, low, high = match.groups()
+    if chars_class == '\\d':
+        chars = string.digits
+    else:
+        body = chars_class[1:-1].replace('\\d', '0-9')
+        if body.startswith('^') or '\\' in body:
+            return None
+        chars = ''
+        i = 0
+        while i < len(body):
+            if i + 2 < len(body) and body[i + 1] == '-':
+                chars += ''.join(chr(c) for c in range(ord(body[i]), ord(body[i + 2]) + 1))
+                i += 3
+            else:
+                chars += body[i]
+                i += 1
+    # Для диапазона повторений берётся 5 символов в его пределах, как и для строк без шаблона.
+    low = int(low)
+    if high is None:
+        length = low
+    elif not high:
+        length = max(low, 5)
+    else:
+        length = max(low, min(int(high), 5))
+    return ''.join(rng.choices(chars, k=length))
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'xsd-to-docx')
+
+
+class SchemaCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or os.environ.get('XSD2DOCX_CACHE_DIR') or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def key(self, raw_data):
+        h = hashlib.sha256()
+        h.update(f"{GENERATOR_VERSION}:{CACHE_FORMAT}:".encode('ascii'))
+        h.update(raw_data)
+        return h.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def contains(self, key):
+        return os.path.exists(self.entry_path(key))
+
+    def get(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                record = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Повреждённая запись кэша {path}: {e}")
+            self.remove(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return record
+
+    def put(self, key, record, evict=True):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.entry_path(key)
+            # Запись в кэш идёт из нескольких процессов и из потоков службы с общим дисковым кэшем.
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            if evict:
+                self.evict()
+        except OSError as e:
+            print(f"Не удалось записать кэш схемы: {e}")
+
+    def remove(self, key):
+        try:
+            os.remove(self.entry_path(key))
+        except OSError:
+            pass
+
+    def entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        result = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            result.append((st.st_mtime, st.st_size, path))
+        return result
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class MemorySchemaCache:
+    # Кэш режима службы: разобранные схемы и фрагменты хранятся в памяти процесса и общие для всех
+    # запросов. Ключи те же, что у SchemaCache (хэш содержимого), поэтому изменённый файл получает
+    # новую запись, а старая вытесняется как давно не использованная. backing - дисковый кэш,
+    # из которого служба прогревается и в который дописывает новые записи.
+    def __init__(self, max_entries=DEFAULT_MEMORY_CACHE_ENTRIES, backing=None):
+        self.max_entries = max_entries
+        self.backing = backing
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, raw_data):
+        return SchemaCache.key(self, raw_data)
+
+    def get(self, key):
+        with self.lock:
+            record = self.entries.pop(key, None)
+            if record is not None:
+                self.entries[key] = record
+                self.hits += 1
+                return record
+            self.misses += 1
+        if self.backing is None:
+            return None
+        record = self.backing.get(key)
+        if record is not None:
+            self.put(key, record, evict=True, write_backing=False)
+        return record
+
+    def contains(self, key):
+        with self.lock:
+            if key in self.entries:
+                return True
+        return self.backing is not None and self.backing.contains(key)
+
+    def put(self, key, record, evict=True, write_backing=True):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = record
+        if evict:
+            self.evict()
+        if write_backing and self.backing is not None:
+            self.backing.put(key, record, evict=evict)
+
+    def remove(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+        if self.backing is not None:
+            self.backing.remove(key)
+
+    def evict(self):
+        # dict сохраняет порядок вставки, а get переставляет запись в конец - первыми идут давно не использованные.
+        with self.lock:
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+        if self.backing is not None:
+            self.backing.evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                    'misses': self.misses}
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт ru_maxrss в килобайтах, macOS - в байтах.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+NULL_STAGE = contextlib.nullcontext()
+
+
+class NullProfiler:
+    # Профилирование выключено: этапы не замеряются, методы генератора не оборачиваются.
+    def stage(self, name, detail=None):
+        return NULL_STAGE
+
+    def count_calls(self, obj, names):
+        pass
+
+    def start(self):
+        pass
+
+    def write_report(self, output_path):
+        pass
+
+
+class Profiler:
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.details = []
+        self.counters = {}
+        self.local = threading.local()
+        self.started = None
+        self.owns_tracemalloc = False
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.owns_tracemalloc = True
+
+    @contextlib.contextmanager
+    def stage(self, name, detail=None):
+        # Пик tracemalloc общий на процесс, поэтому перед вложенным этапом пик внешнего
+        # запоминается в стеке, а после - восстанавливается как максимум. При параллельной
+        # загрузке стек у каждого потока свой, а память этапов оценивается приблизительно.
+        import tracemalloc
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        stack = self.local.__dict__.setdefault('stack', [])
+        frame = {'child_peak': 0, 'base': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = current
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            memory_peak = None
+            if tracing:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+                memory_peak = peak - frame['base']
+                if stack:
+                    stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+            self.record(name, detail, elapsed, memory_peak)
+
+    def record(self, name, detail, elapsed, memory_peak):
+        stats = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'memory_peak_bytes': None,
+                                              'rss_peak_bytes': None})
+        stats['calls'] += 1
+        stats['seconds'] += elapsed
+        if memory_peak is not None:
+            stats['memory_peak_bytes'] = max(stats['memory_peak_bytes'] or 0, memory_peak)
+        stats['rss_peak_bytes'] = peak_rss_bytes()
+        if detail is not None:
+            self.details.append({'stage': name, 'detail': detail, 'seconds': elapsed,
+                                 'memory_peak_bytes': memory_peak})
+
+    def count_calls(self, obj, names):
+        # Счётчики ставятся обёртками на экземпляр, поэтому без профилирования горячие
+        # методы вызываются напрямую и ничего не стоят.
+        for name in names:
+            self.counters.setdefault(name, 0)
+            setattr(obj, name, self.counted(name, getattr(obj, name)))
+
+    def counted(self, name, method):
+        counters = self.counters
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            counters[name] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    def report(self):
+        return {
+            'generator_version': GENERATOR_VERSION,
+            'total_seconds': time.perf_counter() - self.started if self.started is not None else None,
+            'rss_peak_bytes': peak_rss_bytes(),
+            'stages': self.stages,
+            'counters': self.counters,
+            'files': self.details,
+        }
+
+    def write_report(self, output_path):
+        report_path = os.path.splitext(output_path)[0] + '.profile.json'
+        report = self.report()
+        if self.owns_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self.owns_tracemalloc = False
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Отчёт профилирования: {report_path}")
+
+
+render_generator = None
+
+
+def init_render_worker(generator):
+    global render_generator
+    render_generator = generator
+
+
+def render_fragment_task(method_name, args):
+    writer = FragmentWriter()
+    getattr(render_generator, method_name)(writer, *args)
+    return writer.fragment
+
+
+def render_message_task(path, output_path, output_format, streaming, template_path):
+    started = time.perf_counter()
+    try:
+        render_generator.generate_message(path, output_path, output_format, streaming, template_path)
+        return output_path, time.perf_counter() - started, None
+    except Exception as e:
+        return output_path, time.perf_counter() - started, str(e)
+
+
 class XSDDocumentationGenerator:
-    def __init__(self):
+    def __init__(self, cache=None, load_workers=1, seed=None, example_max_depth=DEFAULT_EXAMPLE_MAX_DEPTH,
+                 incremental=False, profile=False, render_workers=1, stream_parse=False, prune=False, roots=None,
+                 volume_rows=None, volume_bytes=None):
+        self.cache = cache
+        # Бюджет тома: при превышении числа строк таблиц или объёма XML тела документ делится на тома.
+        self.volume_rows = volume_rows
+        self.volume_bytes = volume_bytes
+        # Отсечение по достижимости: документируются только компоненты, достижимые из корневых элементов
+        # roots (имена элементов или схем; по умолчанию - глобальные элементы схем сообщений).
+        self.prune = prune
+        self.roots = roots
+        self.stream_parse = stream_parse
+        self.render_workers = render_workers
+        # Без отчётов о загрузке и фрагментах: генераторы сообщений режима --fan-out.
+        self.quiet = False
+        self.incremental = incremental
+        self.load_workers = load_workers
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.example_max_depth = example_max_depth
         self.visited_files = set()
+        # Содержимое XSD из архивов и отображений по виртуальным путям; остальные пути читаются с диска.
+        self.virtual_files = {}
         self.schemas = {}
         self.enum_types = {}
         self.namespaces = {}
         self.simple_types = []
+        self.interned_types = {}
         self.root_elements = {}
+        self.schema_paths = {}
+        self.schema_includes = {}
+        self.source_digests = {}
+        self.fragment_stats = {'reused': 0, 'rendered': 0}
+        self.fragment_plan = None
+        self.fragment_futures = None
+        self.message_cache = None
+        self.volumes = None
+        self.volume = None
+        self.volume_fragments = None
+        # Номер тома каждого фрагмента в порядке их вывода (см. plan_volumes).
+        self.unit_volumes = []
+        self.fragment_index = 0
+        self.step_fragments = {}
+        self.item_volumes = {}
+        self.section_volumes = {}
+        self.profiler = Profiler() if profile else NullProfiler()
+        self.profiler.count_calls(self, PROFILED_METHODS)
+        self._symbols = None
+        self._type_classes = None
+        self._reachable = None
+        self.type_rows_cache = {}
+        self.content_models = {}
+        self.expanding_types = set()
+
+    def __getstate__(self):
+        # Генератор передаётся в рабочие процессы отрисовки: кэши по id() и профилировщик
+        # в другом процессе недействительны и строятся там заново.
+        state = self.__dict__.copy()
+        for name in PROFILED_METHODS:
+            state.pop(name, None)
+        state.update(_symbols=None, _type_classes=None, _reachable=None, type_rows_cache={}, content_models={},
+                     expanding_types=set(), profiler=NullProfiler(), fragment_plan=None, fragment_futures=None,
+                     virtual_files={}, message_cache=None, volumes=None, volume=None, volume_fragments=None)
+        return state
+
+    def mount_archive(self, source):
+        files = read_schema_archive(source)
+        self.virtual_files.update(files)
+        return sorted(files)
+
+    def expand_sources(self, file_paths):
+        paths = []
+        for path in file_paths:
+            if is_schema_archive(path):
+                paths.extend(self.mount_archive(path))
+            else:
+                paths.append(path)
+        return paths
+
+    def source_exists(self, path):
+        return path in self.virtual_files or os.path.exists(path)
+
+    def read_source(self, path):
+        raw_data = self.virtual_files.get(path)
+        if raw_data is not None:
+            return raw_data
+        with open(path, 'rb') as f:
+            return f.read()
 
     def load_schema(self, file_path):
+        if is_schema_archive(file_path):
+            for path in self.mount_archive(file_path):
+                self.load_schema(path)
+            return
+
         file_path = os.path.normpath(file_path)
         if file_path in self.visited_files:
             return
         self.visited_files.add(file_path)
 
-        if not os.path.exists(file_path):
+        if not self.source_exists(file_path):
             print(f"Файл не найден: {file_path}")
             return
 
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-            detected = chardet.detect(raw_data)
-            encoding = detected['encoding']
-            if encoding is None or encoding.lower() in ('ascii', 'utf-8', 'utf-8-sig'):
-                encoding = 'utf-8'
+            with self.profiler.stage('load_schema', file_path):
+                raw_data = self.read_source(file_path)
 
-            parser = etree.XMLParser(encoding=encoding, recover=True)
-            tree = etree.parse(file_path, parser)
-            root = tree.getroot()
-
-            schema_name = os.path.basename(file_path)
-            if schema_name.lower().endswith('.xsd'):
-                schema_name = schema_name[:-4]
-            schema_doc = get_doc(root)
-
-            global_elements = root.xpath('/xs:schema/xs:element[@name]', namespaces=NS)
-
-            first_element_name = ""
-            first_element_doc = ""
-            if global_elements:
-                first_elem = global_elements[0]
-                first_element_name = first_elem.get('name')
-                first_element_doc = get_doc(first_elem)
-
-            complex_types = {}
-            for t in root.xpath('//xs:complexType[@name]', namespaces=NS):
-                name = t.get('name')
-                complex_types[name] = t
-
-            for t in root.xpath('//xs:simpleType[@name]', namespaces=NS):
-                name = t.get('name')
-                enumerations = t.xpath('.//xs:enumeration', namespaces=NS)
-                is_enum = len(enumerations) > 0
-
-                base_type = ""
-                restrictions = {}
-                restriction_elem = t.find('.//xs:restriction', namespaces=NS)
-                if restriction_elem is not None:
-                    base_type = restriction_elem.get('base', '')
-                    for facet in restriction_elem:
-                        tag = str(facet.tag)
-                        if tag.startswith(f"{{{NS['xs']}}}"):
-                            facet_name = tag[len(f"{{{NS['xs']}}}"):]
-
-                            if facet_name in [
-                                'minLength', 'maxLength', 'minInclusive', 'maxInclusive',
-                                'minExclusive', 'maxExclusive', 'pattern', 'totalDigits',
-                                'fractionDigits'
-                            ]:
-                                restrictions[facet_name] = facet.get('value', '')
-
-                type_record = {
-                    'name': name,
-                    'file': schema_name,
-                    'base_type': base_type,
-                    'restrictions': restrictions,
-                    'description': get_doc(t),
-                    'is_enum': is_enum
-                }
-                self.simple_types.append(type_record)
-
-                if is_enum:
-                    enum_values = []
-                    for enum in enumerations:
-                        code = enum.get('value')
-                        desc = get_doc(enum)
-                        if not desc:
-                            desc = code
-                        enum_values.append((code, desc))
-                    self.enum_types[name] = enum_values
-
-            for inc in root.xpath('.//xs:include | .//xs:import', namespaces=NS):
-                loc = inc.get('schemaLocation')
-                if loc:
-                    next_path = resolve_path(loc, file_path)
-                    self.load_schema(next_path)
-
-            self.schemas[file_path] = {
-                'name': schema_name,
-                'doc': schema_doc,
-                'first_element_name': first_element_name,
-                'first_element_doc': first_element_doc,
-                'complex_types': complex_types,
-                'global_elements': global_elements,
-                'root': root,
-                'tree': tree
-            }
-
-            if global_elements:
-                self.root_elements[schema_name] = global_elements[0]
-
-            print(f"Загружена схема: {schema_name}")
+                record, cache_key = self.lookup_cache(file_path, raw_data)
+                if record is None:
+                    record = self.extract_schema(file_path, raw_data)
+                    if self.cache is not None:
+                        self.cache.put(cache_key, record)
+            self.merge_schema(file_path, record, self.load_schema, hashlib.sha256(raw_data).hexdigest())
 
         except Exception as e:
             print(f"Ошибка при загрузке {file_path}: {e}")
             import traceback
             traceback.print_exc()
 
-    def add_shading(self, cell, color='D9D9D9'):
-        shading = OxmlElement('w:shd')
-        shading.set(qn('w:fill'), color)
-        cell._tc.get_or_add_tcPr().append(shading)
+    def load_schemas(self, file_paths, workers=None):
+        if workers is None:
+            workers = self.load_workers
+        file_paths = self.expand_sources(file_paths)
+        if workers <= 1:
+            for path in file_paths:
+                self.load_schema(path)
+            return
 
-    def create_table_with_header(self, doc, headers, widths=None):
-        table = doc.add_table(rows=1, cols=len(headers), style='Table Grid')
-        table.autofit = False
+        graph = self.discover_schema_graph(file_paths)
+        pending = [path for path, node in graph.items() if node['raw'] is not None and node['record'] is None]
+
+        def extract(path):
+            try:
+                with self.profiler.stage('load_schema', path):
+                    return self.extract_schema(path, graph[path]['raw']), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for path, (result, error) in zip(pending, pool.map(extract, pending)):
+                node = graph[path]
+                node['error'] = error
+                if result is not None:
+                    node['record'] = result
+                    if self.cache is not None:
+                        self.cache.put(node['cache_key'], node['record'])
+
+        # Слияние повторяет порядок обхода load_schema, поэтому simple_types, schemas и
+        # root_elements заполняются в той же последовательности, что и при последовательной загрузке.
+        def merge(path):
+            path = os.path.normpath(path)
+            if path in self.visited_files:
+                return
+            self.visited_files.add(path)
+
+            node = graph.get(path)
+            if node is None:
+                self.visited_files.discard(path)
+                self.load_schema(path)
+                return
+            if node['raw'] is None:
+                print(f"Файл не найден: {path}")
+                return
+
+            try:
+                if node['error'] is not None:
+                    raise node['error']
+                self.merge_schema(path, node['record'], merge, hashlib.sha256(node['raw']).hexdigest())
+            except Exception as e:
+                print(f"Ошибка при загрузке {path}: {e}")
+                import traceback
+                traceback.print_exception(type(e), e, e.__traceback__)
+
+        for path in file_paths:
+            merge(path)
+
+    def discover_schema_graph(self, file_paths):
+        graph = {}
+        stack = [os.path.normpath(path) for path in reversed(file_paths)]
+        while stack:
+            path = stack.pop()
+            if path in graph or path in self.visited_files:
+                continue
+            node = {'raw': None, 'record': None, 'cache_key': None, 'includes': [], 'error': None}
+            graph[path] = node
+            if not self.source_exists(path):
+                continue
+
+            try:
+                node['raw'] = self.read_source(path)
+                node['record'], node['cache_key'] = self.lookup_cache(path, node['raw'])
+                if node['record'] is not None:
+                    locations = node['record'].includes
+                else:
+                    locations = scan_schema_locations(node['raw'])
+            except Exception as e:
+                node['error'] = e
+                continue
+
+            node['includes'] = [resolve_path(loc, path) for loc in locations]
+            stack.extend(reversed(node['includes']))
+        return graph
+
+    def lookup_cache(self, file_path, raw_data):
+        if self.cache is None:
+            return None, None
+        # Запись хранит имя схемы (SchemaRecord.name, SimpleTypeRecord.file), поэтому оно входит в ключ:
+        # переименованный файл или копия с тем же содержимым не получат чужое имя.
+        cache_key = self.cache.key(schema_name_for(file_path).encode('utf-8') + b'\0' + raw_data)
+        return self.cache.get(cache_key), cache_key
+
+    def type_files(self, st):
+        return ", ".join(self.interned_types[(st.name, st.fingerprint)].files)
+
+    def classify_simple_types(self):
+        # Один проход по simple_types: раздел словаря типов и унаследованные ограничения
+        # для каждого типа. Результат общий для раздела 6 и оглавления.
+        if self._type_classes is None:
+            owners = {id(st): schema for schema in self.schemas.values() for st in schema.simple_types}
+            classes = {category: {} for category, _ in DATA_TYPE_SECTIONS}
+            for st in self.documented_simple_types():
+                derivation = self.symbols.derivation(st, owners.get(id(st)))
+                classes[type_category(derivation)].setdefault(st.name, []).append((st, derivation.facets))
+            self._type_classes = classes
+        return self._type_classes
+
+    @property
+    def reachable(self):
+        # id() достижимых глобальных элементов и составных типов и (имя, отпечаток) простых типов;
+        # None - отсечение выключено.
+        if not self.prune:
+            return None
+        if self._reachable is None:
+            self._reachable = self.collect_reachable()
+        return self._reachable
+
+    def prune_roots(self):
+        messages = set(self.message_schemas())
+        roots = []
+        for path, schema in self.schemas.items():
+            for elem in schema.global_elements:
+                if self.roots:
+                    if elem.name in self.roots or schema.name in self.roots:
+                        roots.append((elem, schema))
+                elif path in messages:
+                    roots.append((elem, schema))
+        return roots
+
+    def collect_reachable(self):
+        # Обход графа типов от корневых элементов: типы и ссылки элементов, вложенные анонимные типы,
+        # базовые типы xs:extension и xs:restriction, типы атрибутов.
+        symbols = self.symbols
+        reachable = set()
+        roots = self.prune_roots()
+        stack = [(elem, schema) for elem, schema in roots]
+
+        def push_type(qname, schema):
+            if not qname:
+                return
+            ct, ct_schema = symbols.complex_type(qname, schema)
+            if ct is not None:
+                stack.append((ct, ct_schema))
+                return
+            st, st_schema = symbols.simple_type(qname, schema)
+            if st is not None:
+                stack.append((st, st_schema))
+
+        while stack:
+            node, schema = stack.pop()
+            key = (node.name, node.fingerprint) if isinstance(node, SimpleTypeRecord) else id(node)
+            if key in reachable:
+                continue
+            reachable.add(key)
+            if isinstance(node, ElementRecord):
+                if node.ref:
+                    elem, elem_schema = symbols.element(node.ref, schema)
+                    if elem is not None:
+                        stack.append((elem, elem_schema))
+                if node.complex_type is not None:
+                    stack.append((node.complex_type, schema))
+                push_type(node.type, schema)
+            elif isinstance(node, ComplexTypeRecord):
+                stack.extend((elem, schema) for elem in node.all_elements)
+                for attr in node.attributes:
+                    push_type(attr.type, schema)
+                if node.extension is not None:
+                    push_type(node.extension.base, schema)
+                    stack.extend((elem, schema) for elem in node.extension.elements)
+            else:
+                push_type(node.base_type, schema)
+
+        return reachable
+
+    def report_pruning(self):
+        reachable = self.reachable
+        roots = self.prune_roots()
+        elements = [elem for schema in self.schemas.values() for elem in schema.global_elements]
+        complex_types = [ct for schema in self.schemas.values() for ct in schema.complex_types.values()]
+        kept_simple = sum((st.name, st.fingerprint) in reachable for st in self.simple_types)
+        kept_enums = sum((st.name, st.fingerprint) in reachable for st in self.simple_types if st.is_enum)
+        print(f"Отсечение по достижимости от {len(roots)} корневых элементов: "
+              f"глобальных элементов {sum(id(e) in reachable for e in elements)} из {len(elements)}, "
+              f"составных типов {sum(id(ct) in reachable for ct in complex_types)} из {len(complex_types)}, "
+              f"простых типов {kept_simple} из {len(self.simple_types)}, "
+              f"перечислений {kept_enums} из {sum(st.is_enum for st in self.simple_types)}")
+
+    def documented_simple_types(self):
+        reachable = self.reachable
+        if reachable is None:
+            return self.simple_types
+        return [st for st in self.simple_types if (st.name, st.fingerprint) in reachable]
+
+    def documented_enum_names(self):
+        return sorted({st.name for st in self.documented_simple_types() if st.is_enum} & self.enum_types.keys())
+
+    def documented_elements(self, schema):
+        reachable = self.reachable
+        if reachable is None:
+            return schema.global_elements
+        return [elem for elem in schema.global_elements if id(elem) in reachable]
+
+    def documented_schema(self, schema):
+        reachable = self.reachable
+        if reachable is None:
+            return True
+        return (any(id(elem) in reachable for elem in schema.global_elements) or
+                any(id(ct) in reachable for ct in schema.complex_types.values()))
+
+    def documented_roots(self):
+        reachable = self.reachable
+        return [name for name, elem in self.root_elements.items() if reachable is None or id(elem) in reachable]
+
+    def documented_names(self, schema):
+        # Часть ключа фрагмента раздела 4: набор документируемых компонентов схемы зависит от корней.
+        reachable = self.reachable
+        if reachable is None:
+            return None
+        return (tuple(elem.name for elem in schema.global_elements if id(elem) in reachable),
+                tuple(sorted(name for name, ct in schema.complex_types.items() if id(ct) in reachable)))
+
+    @property
+    def symbols(self):
+        if self._symbols is None:
+            self._symbols = SymbolTable(self.schemas)
+        return self._symbols
+
+    def merge_schema(self, file_path, record, load_include, digest, quiet=False):
+        self._symbols = None
+        self._type_classes = None
+        self._reachable = None
+        for st in record.simple_types:
+            key = (st.name, st.fingerprint)
+            interned = self.interned_types.get(key)
+            if interned is None:
+                self.interned_types[key] = InternedType(st, record.enum_types.get(st.name, []), [st.file])
+                self.simple_types.append(st)
+            elif st.file not in interned.files:
+                interned.files.append(st.file)
+        self.enum_types.update(record.enum_types)
+        self.source_digests[file_path] = digest
+        self.schema_includes[file_path] = [os.path.normpath(resolve_path(loc, file_path)) for loc in record.includes]
+
+        for loc in record.includes:
+            next_path = resolve_path(loc, file_path)
+            load_include(next_path)
+
+        self.schemas[file_path] = record
+        self.schema_paths[record.name] = file_path
+
+        if record.global_elements:
+            self.root_elements[record.name] = record.global_elements[0]
+
+        if not quiet:
+            print(f"Загружена схема: {record.name}")
+
+    def extract_schema(self, file_path, raw_data):
+        if self.stream_parse:
+            return self.extract_schema_stream(file_path, raw_data)
+        with self.profiler.stage('detect_encoding'):
+            encoding = detect_encoding(raw_data)
+        with self.profiler.stage('parse'):
+            parser = etree.XMLParser(encoding=encoding, recover=True)
+            root = etree.fromstring(raw_data, parser, base_url=file_path)
 
-        hdr_cells = table.rows[0].cells
-        for i, h in enumerate(headers):
-            p = hdr_cells[i].paragraphs[0]
-            run = p.add_run(h)
-            run.bold = True
-            p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            self.add_shading(hdr_cells[i])
+        schema_name = schema_name_for(file_path)
+        with self.profiler.stage('doc_index'):
+            docs = build_doc_index(root)
+        schema_doc = docs.get(root, "")
 
-        if widths:
-            for i, w in enumerate(widths):
-                if i < len(table.columns):
-                    table.columns[i].width = w
+        memo = {}
+        global_elements = [
+            extract_element(elem, memo, docs)
+            for elem in root.xpath('/xs:schema/xs:element[@name]', namespaces=NS)
+        ]
 
-        return table
+        first_element_name = ""
+        first_element_doc = ""
+        if global_elements:
+            first_element_name = global_elements[0].name
+            first_element_doc = global_elements[0].doc
+
+        complex_types = {}
+        for t in root.xpath('//xs:complexType[@name]', namespaces=NS):
+            complex_types[t.get('name')] = extract_complex_type(t, memo, docs)
+
+        simple_types = []
+        enum_types = {}
+        for t in root.xpath('//xs:simpleType[@name]', namespaces=NS):
+            record, enum_values = extract_simple_type(t, schema_name, docs)
+            simple_types.append(record)
+            if record.is_enum:
+                enum_types[record.name] = enum_values
+
+        includes = []
+        included = []
+        for inc in root.xpath('.//xs:include | .//xs:import', namespaces=NS):
+            loc = inc.get('schemaLocation')
+            if loc:
+                includes.append(loc)
+                if inc.tag == XS_INCLUDE:
+                    included.append(loc)
+
+        # Дерево lxml освобождается сразу после извлечения: дальше генератор работает только с записями модели.
+        return SchemaRecord(
+            name=schema_name,
+            doc=schema_doc,
+            target_namespace=root.get('targetNamespace'),
+            nsmap=dict(root.nsmap),
+            first_element_name=first_element_name,
+            first_element_doc=first_element_doc,
+            simple_types=simple_types,
+            enum_types=enum_types,
+            includes=includes,
+            complex_types=complex_types,
+            global_elements=global_elements,
+            included=included
+        )
+
+    def extract_schema_stream(self, file_path, raw_data):
+        # Один проход iterparse вместо DOM и отдельных XPath-обходов: компонент верхнего уровня
+        # разбирается по событию закрытия и сразу удаляется, так что в памяти только текущий компонент.
+        with self.profiler.stage('detect_encoding'):
+            encoding = detect_encoding(raw_data)
+
+        schema_name = schema_name_for(file_path)
+        root = None
+        schema_doc = None
+        global_elements = []
+        complex_types = {}
+        simple_types = []
+        enum_types = {}
+        includes = []
+        included = []
+        depth = 0
+        with self.profiler.stage('iterparse'):
+            context = etree.iterparse(io.BytesIO(raw_data), events=('start', 'end'), encoding=encoding, recover=True)
+            for event, elem in context:
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                # Ссылки между компонентами идут по именам, поэтому memo и индекс документации
+                # достаточно строить в пределах одного компонента.
+                memo = {}
+                docs = build_doc_index(elem)
+                if schema_doc is None and root in docs:
+                    schema_doc = docs[root]
+                if elem.tag == XS_ELEMENT and elem.get('name'):
+                    global_elements.append(extract_element(elem, memo, docs))
+                for node in elem.iter(XS_COMPLEX_TYPE, XS_SIMPLE_TYPE, XS_INCLUDE, XS_IMPORT):
+                    if node.tag == XS_COMPLEX_TYPE:
+                        if node.get('name'):
+                            complex_types[node.get('name')] = extract_complex_type(node, memo, docs)
+                    elif node.tag == XS_SIMPLE_TYPE:
+                        if node.get('name'):
+                            record, enum_values = extract_simple_type(node, schema_name, docs)
+                            simple_types.append(record)
+                            if record.is_enum:
+                                enum_types[record.name] = enum_values
+                    else:
+                        loc = node.get('schemaLocation')
+                        if loc:
+                            includes.append(loc)
+                            if node.tag == XS_INCLUDE:
+                                included.append(loc)
+
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del root[0]
+
+        first_element_name = ""
+        first_element_doc = ""
+        if global_elements:
+            first_element_name = global_elements[0].name
+            first_element_doc = global_elements[0].doc
+
+        return SchemaRecord(
+            name=schema_name,
+            doc=schema_doc or "",
+            target_namespace=root.get('targetNamespace'),
+            nsmap=dict(root.nsmap),
+            first_element_name=first_element_name,
+            first_element_doc=first_element_doc,
+            simple_types=simple_types,
+            enum_types=enum_types,
+            includes=includes,
+            complex_types=complex_types,
+            global_elements=global_elements,
+            included=included
+        )
 
     def add_row_to_table(self, table, values):
-        cells = table.add_row().cells
-        for i, text in enumerate(values):
-            if i < len(cells):
-                cell_text = str(text) if text is not None else ""
-                cells[i].text = cell_text
-                for p in cells[i].paragraphs:
-                    p.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                    for run in p.runs:
-                        run.font.size = Pt(10)
-                cells[i].vertical_alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        table.append(values)
 
     def describe_type(self, table, node, schema_info, level=0):
-        _ = schema_info
-        if node.tag == f"{{{NS['xs']}}}complexType" and node.get('name'):
-            type_name = node.get('name')
-            self.add_row_to_table(table, [type_name, "", "блок", get_doc(node), ""])
-            seq_all = node.xpath('.//xs:sequence | .//xs:all', namespaces=NS)
-            if seq_all:
-                for elem in seq_all[0].xpath('xs:element', namespaces=NS):
-                    self.describe_element(table, elem, schema_info, level + 1)
-            self.add_row_to_table(table, [f"/{type_name}", "", "", "Конец блока", ""])
-            return
+        table.extend(self.type_rows(node, schema_info, level))
+
+    def type_rows(self, node, schema_info, level=0):
+        # Строки типа не зависят от места, где он описывается, поэтому разворачиваются один раз
+        # и затем воспроизводятся из кэша; повторный вход в разворачиваемый тип — рекурсия.
+        key = id(node)
+        rows = self.type_rows_cache.get(key)
+        if rows is not None:
+            return rows
+        if key in self.expanding_types:
+            name = node.name or "анонимный тип"
+            return (("", "", f"ref: {name}", f"Рекурсивная ссылка на {name}", ""),)
+
+        self.expanding_types.add(key)
+        try:
+            rows = []
+            if node.name:
+                self.add_row_to_table(rows, [node.name, "", "блок", node.doc, ""])
+                for elem in node.elements:
+                    self.describe_element(rows, elem, schema_info, level + 1)
+                self.add_row_to_table(rows, [f"/{node.name}", "", "", "Конец блока", ""])
+            else:
+                for elem in node.elements:
+                    self.describe_element(rows, elem, schema_info, level + 1)
+        finally:
+            self.expanding_types.discard(key)
 
-        if node.tag == f"{{{NS['xs']}}}complexType" and not node.get('name'):
-            seq_all = node.xpath('.//xs:sequence | .//xs:all', namespaces=NS)
-            if seq_all:
-                for elem in seq_all[0].xpath('xs:element', namespaces=NS):
-                    self.describe_element(table, elem, schema_info, level + 1)
-            return
+        rows = tuple(rows)
+        self.type_rows_cache[key] = rows
+        return rows
 
     def describe_element(self, table, elem, schema_info, level=0):
         _ = schema_info
-        name = elem.get('name')
-        ref = elem.get('ref')
-        type_name = elem.get('type')
-        min_occurs = elem.get('minOccurs', '1')
-        required = "Да" if min_occurs == '1' else "Нет"
+        name = elem.name
+        ref = elem.ref
+        type_name = elem.type
+        required = "Да" if elem.min_occurs == '1' else "Нет"
 
-        if elem.getparent().tag == f"{{{NS['xs']}}}choice":
+        if elem.in_choice:
             required = "Нет\nВыбор"
 
         if ref:
             local_ref = ref.split(':')[-1] if ':' in ref else ref
-            self.add_row_to_table(table, ["", name, f"ref: {local_ref}", get_doc(elem), required])
+            self.add_row_to_table(table, ["", name, f"ref: {local_ref}", elem.doc, required])
             return
 
         if type_name:
             local_type = type_name.split(':')[-1] if ':' in type_name else type_name
-            if local_type in schema_info['complex_types']:
-                self.add_row_to_table(table, ["", name, local_type, get_doc(elem), required])
-            elif local_type in self.enum_types:
-                self.add_row_to_table(table, ["", name, local_type, get_doc(elem), required])
-            else:
-                self.add_row_to_table(table, ["", name, local_type, get_doc(elem), required])
+            self.add_row_to_table(table, ["", name, local_type, elem.doc, required])
             return
 
-        complex_type = elem.find('xs:complexType', namespaces=NS)
-        if complex_type is not None:
-            self.add_row_to_table(table, ["", name, "блок", get_doc(elem), ""])
-            self.describe_type(table, complex_type, schema_info, level + 1)
+        if elem.complex_type is not None:
+            self.add_row_to_table(table, ["", name, "блок", elem.doc, ""])
+            self.describe_type(table, elem.complex_type, schema_info, level + 1)
             self.add_row_to_table(table, ["", f"/{name}", "", "Конец блока", ""])
             return
 
-        self.add_row_to_table(table, ["", name, type_name or "string", get_doc(elem), required])
+        self.add_row_to_table(table, ["", name, type_name or "string", elem.doc, required])
 
     def add_data_types_dictionary(self, doc):
         doc.add_heading('6. Словарь типов данных', level=1)
 
-        if not self.simple_types:
+        if not self.documented_simple_types():
             doc.add_paragraph("Простые типы данных не найдены.")
             return
 
-        string_types = {}
-        decimal_types = {}
-        integer_types = {}
-        datetime_types = {}
-        other_types = {}
-
-        for type_info in self.simple_types:
-            type_name = type_info['name']
-            base_type = type_info['base_type'].lower()
-            if 'string' in base_type:
-                string_types.setdefault(type_name, []).append(type_info)
-            elif 'decimal' in base_type:
-                decimal_types.setdefault(type_name, []).append(type_info)
-            elif any(t in base_type for t in ['int', 'integer', 'long', 'short', 'byte']):
-                integer_types.setdefault(type_name, []).append(type_info)
-            elif any(t in base_type for t in ['date', 'time']):
-                datetime_types.setdefault(type_name, []).append(type_info)
-            else:
-                other_types.setdefault(type_name, []).append(type_info)
+        classes = self.classify_simple_types()
+        titles = dict(DATA_TYPE_SECTIONS)
+        string_types = classes['string']
+        decimal_types = classes['decimal']
+        integer_types = classes['integer']
+        datetime_types = classes['datetime']
+        other_types = classes['other']
 
         if string_types:
-            doc.add_heading('6.1. Строковые типы (string)', level=2)
+            doc.add_heading(titles['string'], level=2)
             headers = ["Имя XSD-файла", "Имя типа", "Базовый тип", "Мин. длина", "Макс. длина", "Паттерн", "Как заполняется"]
-            widths = [Inches(1.2), Inches(1.0), Inches(0.8), Inches(0.6), Inches(0.6), Inches(1.0), Inches(2.0)]
-            table = self.create_table_with_header(doc, headers, widths)
+            widths = [inches(1.2), inches(1.0), inches(0.8), inches(0.6), inches(0.6), inches(1.0), inches(2.0)]
+            table = []
             for type_name in sorted(string_types.keys()):
-                for info in string_types[type_name]:
-                    restrictions = info['restrictions']
+                for info, restrictions in string_types[type_name]:
                     row = [
-                        info['file'],
+                        self.type_files(info),
                         type_name,
-                        info['base_type'],
+                        info.base_type,
                         restrictions.get('minLength', ''),
                         restrictions.get('maxLength', ''),
                         restrictions.get('pattern', ''),
-                        info['description']
+                        info.description
                     ]
                     self.add_row_to_table(table, row)
+            doc.add_table(headers, table, widths, autofit=False)
 
         if decimal_types:
-            doc.add_heading('6.2. Десятичные типы (decimal)', level=2)
+            doc.add_heading(titles['decimal'], level=2)
             headers = ["Имя XSD-файла", "Имя типа", "Базовый тип", "Мин. значение", "Макс. значение", "Всего цифр", "Дробных цифр", "Как заполняется"]
-            widths = [Inches(1.0), Inches(1.0), Inches(0.8), Inches(0.7), Inches(0.7), Inches(0.6), Inches(0.6), Inches(1.8)]
-            table = self.create_table_with_header(doc, headers, widths)
+            widths = [inches(1.0), inches(1.0), inches(0.8), inches(0.7), inches(0.7), inches(0.6), inches(0.6), inches(1.8)]
+            table = []
             for type_name in sorted(decimal_types.keys()):
-                for info in decimal_types[type_name]:
-                    restrictions = info['restrictions']
+                for info, restrictions in decimal_types[type_name]:
                     row = [
-                        info['file'],
+                        self.type_files(info),
                         type_name,
-                        info['base_type'],
+                        info.base_type,
                         restrictions.get('minInclusive', restrictions.get('minExclusive', '')),
                         restrictions.get('maxInclusive', restrictions.get('maxExclusive', '')),
                         restrictions.get('totalDigits', ''),
                         restrictions.get('fractionDigits', ''),
-                        info['description']
+                        info.description
                     ]
                     self.add_row_to_table(table, row)
+            doc.add_table(headers, table, widths, autofit=False)
 
         if integer_types:
-            doc.add_heading('6.3. Целочисленные типы (int)', level=2)
+            doc.add_heading(titles['integer'], level=2)
             headers = ["Имя XSD-файла", "Имя типа", "Базовый тип", "Мин. значение", "Макс. значение", "Как заполняется"]
-            widths = [Inches(1.2), Inches(1.0), Inches(0.8), Inches(0.8), Inches(0.8), Inches(2.2)]
-            table = self.create_table_with_header(doc, headers, widths)
+            widths = [inches(1.2), inches(1.0), inches(0.8), inches(0.8), inches(0.8), inches(2.2)]
+            table = []
             for type_name in sorted(integer_types.keys()):
-                for info in integer_types[type_name]:
-                    restrictions = info['restrictions']
+                for info, restrictions in integer_types[type_name]:
                     row = [
-                        info['file'],
+                        self.type_files(info),
                         type_name,
-                        info['base_type'],
+                        info.base_type,
                         restrictions.get('minInclusive', restrictions.get('minExclusive', '')),
                         restrictions.get('maxInclusive', restrictions.get('maxExclusive', '')),
-                        info['description']
+                        info.description
                     ]
                     self.add_row_to_table(table, row)
+            doc.add_table(headers, table, widths, autofit=False)
 
         if datetime_types:
-            doc.add_heading('6.4. Типы даты и времени (date и dateTime)', level=2)
+            doc.add_heading(titles['datetime'], level=2)
             headers = ["Имя XSD-файла", "Имя типа", "Базовый тип", "Мин. значение", "Макс. значение", "Шаблон (формат)", "Как заполняется"]
-            widths = [Inches(1.0), Inches(1.0), Inches(0.8), Inches(0.8), Inches(0.8), Inches(1.0), Inches(1.8)]
-            table = self.create_table_with_header(doc, headers, widths)
+            widths = [inches(1.0), inches(1.0), inches(0.8), inches(0.8), inches(0.8), inches(1.0), inches(1.8)]
+            table = []
             for type_name in sorted(datetime_types.keys()):
-                for info in datetime_types[type_name]:
-                    restrictions = info['restrictions']
+                for info, restrictions in datetime_types[type_name]:
                     row = [
-                        info['file'],
+                        self.type_files(info),
                         type_name,
-                        info['base_type'],
+                        info.base_type,
                         restrictions.get('minInclusive', restrictions.get('minExclusive', '')),
                         restrictions.get('maxInclusive', restrictions.get('maxExclusive', '')),
                         restrictions.get('pattern', ''),
-                        info['description']
+                        info.description
                     ]
                     self.add_row_to_table(table, row)
+            doc.add_table(headers, table, widths, autofit=False)
 
         if other_types:
-            doc.add_heading('6.5. Остальные типы', level=2)
+            doc.add_heading(titles['other'], level=2)
             headers = ["Имя XSD-файла", "Имя типа", "Базовый тип", "Как заполняется"]
-            widths = [Inches(1.5), Inches(1.5), Inches(1.0), Inches(3.2)]
-            table = self.create_table_with_header(doc, headers, widths)
+            widths = [inches(1.5), inches(1.5), inches(1.0), inches(3.2)]
+            table = []
             for type_name in sorted(other_types.keys()):
-                for info in other_types[type_name]:
+                for info, _ in other_types[type_name]:
                     row = [
-                        info['file'],
+                        self.type_files(info),
                         type_name,
-                        info['base_type'],
-                        info['description']
+                        info.base_type,
+                        info.description
                     ]
                     self.add_row_to_table(table, row)
+            doc.add_table(headers, table, widths, autofit=False)
 
     def generate_sample_value(self, type_name, schema_info):
-        if type_name in self.enum_types and self.enum_types[type_name]:
-            return self.enum_types[type_name][0][0]
-
-        for type_info in self.simple_types:
-            if type_info['name'] == type_name:
-                base_type = type_info['base_type'].lower()
-                restrictions = type_info['restrictions']
-
-                if 'string' in base_type:
-                    min_len = int(restrictions.get('minLength', 1))
-                    max_len = int(restrictions.get('maxLength', max(min_len, 10)))
-                    length = min(max_len, max(min_len, 5))
-                    pattern = restrictions.get('pattern', '')
-                    if pattern:
-                        if 'digit' in pattern.lower() or '\\d' in pattern:
-                            return ''.join(random.choices(string.digits, k=length))
-                        elif '[a-z]' in pattern.lower():
-                            return ''.join(random.choices(string.ascii_lowercase, k=length))
-                        elif '[a-zA-Z0-9]' in pattern or 'alnum' in pattern.lower():
-                            return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
-                    return ''.join(random.choices(string.ascii_letters, k=length))
-
-                elif any(t in base_type for t in ['int', 'integer', 'long', 'short', 'byte']):
-                    min_val = int(
-                        float(restrictions.get('minInclusive', restrictions.get('minExclusive', -2147483648))))
-                    max_val = int(float(restrictions.get('maxInclusive', restrictions.get('maxExclusive', 2147483647))))
-                    min_val = max(min_val, -2147483648)
-                    max_val = min(max_val, 2147483647)
-                    return str(random.randint(min_val, max_val))
-
-                elif 'decimal' in base_type or 'double' in base_type or 'float' in base_type:
-                    min_val = float(restrictions.get('minInclusive', restrictions.get('minExclusive', -1e6)))
-                    max_val = float(restrictions.get('maxInclusive', restrictions.get('maxExclusive', 1e6)))
-                    fraction_digits = int(restrictions.get('fractionDigits', 2))
-                    value = round(random.uniform(min_val, max_val), fraction_digits)
-                    return f"{value:.{fraction_digits}f}"
-
-                elif 'date' in base_type and 'time' not in base_type:
-                    return "2025-10-20"
-
-                elif 'datetime' in base_type or ('date' in base_type and 'time' in base_type):
-                    return "2025-10-20T12:00:00"
-
-                elif 'boolean' in base_type:
-                    return "true"
+        enum_values = self.symbols.enum(type_name, schema_info)
+        if enum_values:
+            return enum_values[0][0]
+
+        type_info, type_schema = self.symbols.simple_type(type_name, schema_info)
+        type_name = split_qname(type_name)[1]
+        if type_info is not None:
+            # Значение подбирается по встроенному типу в конце цепочки xs:restriction и унаследованным
+            # ограничениям, а не по имени непосредственного базового типа.
+            derivation = self.symbols.derivation(type_info, type_schema)
+            builtin = derivation.builtin or split_qname(derivation.base)[1]
+            category = type_category(derivation)
+            restrictions = derivation.facets
+
+            if category == 'string':
+                min_len = int(restrictions.get('minLength', 1))
+                max_len = int(restrictions.get('maxLength', max(min_len, 10)))
+                length = min(max_len, max(min_len, 5))
+                pattern = restrictions.get('pattern', '')
+                if pattern:
+                    sample = pattern_sample(pattern, self.rng)
+                    if sample is not None:
+                        return sample
+                    if 'digit' in pattern.lower() or '\\d' in pattern:
+                        return ''.join(self.rng.choices(string.digits, k=length))
+                    elif '[a-z]' in pattern.lower():
+                        return ''.join(self.rng.choices(string.ascii_lowercase, k=length))
+                    elif '[a-zA-Z0-9]' in pattern or 'alnum' in pattern.lower():
+                        return ''.join(self.rng.choices(string.ascii_letters + string.digits, k=length))
+                return ''.join(self.rng.choices(string.ascii_letters, k=length))
+
+            elif category == 'integer':
+                low, high = INTEGER_RANGES.get(builtin, INTEGER_RANGES['int'])
+                if 'minInclusive' in restrictions:
+                    low = max(low, int(float(restrictions['minInclusive'])))
+                elif 'minExclusive' in restrictions:
+                    low = max(low, int(float(restrictions['minExclusive'])) + 1)
+                if 'maxInclusive' in restrictions:
+                    high = min(high, int(float(restrictions['maxInclusive'])))
+                elif 'maxExclusive' in restrictions:
+                    high = min(high, int(float(restrictions['maxExclusive'])) - 1)
+                if 'totalDigits' in restrictions:
+                    limit = 10 ** int(restrictions['totalDigits']) - 1
+                    low, high = max(low, -limit), min(high, limit)
+                return str(self.rng.randint(low, max(low, high)))
+
+            elif category == 'decimal' or builtin in ('double', 'float'):
+                min_val = float(restrictions.get('minInclusive', restrictions.get('minExclusive', -1e6)))
+                max_val = float(restrictions.get('maxInclusive', restrictions.get('maxExclusive', 1e6)))
+                fraction_digits = int(restrictions.get('fractionDigits', 2))
+                if 'totalDigits' in restrictions:
+                    limit = 10 ** max(int(restrictions['totalDigits']) - fraction_digits, 0) - 1
+                    min_val, max_val = max(min_val, -limit), min(max_val, limit)
+                value = round(self.rng.uniform(min_val, max(min_val, max_val)), fraction_digits)
+                return f"{value:.{fraction_digits}f}"
+
+            elif builtin == 'date':
+                return "2025-10-20"
+
+            elif builtin in ('dateTime', 'dateTimeStamp'):
+                return "2025-10-20T12:00:00"
+
+            elif builtin == 'time':
+                return "12:00:00"
+
+            elif builtin == 'boolean':
+                return "true"
 
         if 'string' in type_name.lower():
             return "Пример текста"
@@ -424,334 +2166,923 @@ class XSDDocumentationGenerator:
 
         return "Пример значения"
 
-    def find_complex_type(self, type_name):
-        for schema_info in self.schemas.values():
-            if type_name in schema_info['complex_types']:
-                return schema_info['complex_types'][type_name], schema_info
-        return None, None
+    def find_complex_type(self, type_name, schema_info=None):
+        return self.symbols.complex_type(type_name, schema_info)
+
+    def content_model(self, ct, ct_schema):
+        key = id(ct)
+        model = self.content_models.get(key)
+        if model is not None:
+            return model
+
+        # Цепочка xs:extension от типа к базовым; повторно встреченный тип означает цикл наследования.
+        chain = []
+        seen = set()
+        node, node_schema = ct, ct_schema
+        while node is not None and id(node) not in seen:
+            seen.add(id(node))
+            chain.append((node, node_schema))
+            if node.extension is None or not node.extension.base:
+                break
+            node, node_schema = self.find_complex_type(node.extension.base, node_schema)
+
+        model = ContentModel()
+        for node, node_schema in chain:
+            model.attributes.extend((attr, node_schema) for attr in node.attributes)
+        for node, node_schema in reversed(chain):
+            if node.extension is not None:
+                model.elements.extend((elem, node_schema) for elem in node.extension.elements)
+            else:
+                model.elements.extend((elem, node_schema) for elem in node.all_elements)
+
+        self.content_models[key] = model
+        return model
 
-    def generate_xml_example(self, element, schema_info, level=0):
+    def generate_xml_example(self, element, schema_info, level=0, path=None):
         indent = "  " * level
-        name = element.get('name')
+        name = element.name
         if not name:
             return []
 
-        type_name = element.get('type')
-        min_occurs = element.get('minOccurs', '1')
-        max_occurs = element.get('maxOccurs', '1')
-
-        if min_occurs == '0':
+        type_name = element.type
+        if element.min_occurs == '0':
             return []
 
-        result = []
-
         if type_name:
-            local_type = type_name.split(':')[-1] if ':' in type_name else type_name
-
-            ct, ct_schema = self.find_complex_type(local_type)
-            if ct is not None:
-                attr_parts = []
-                all_attributes = []
-
-                def collect_attributes(node, node_schema):
-                    attrs = node.xpath('.//xs:attribute', namespaces=NS)
-                    for attr in attrs:
-                        aname = attr.get('name')
-                        if not aname:
-                            continue
-                        use = attr.get('use', 'optional')
-                        atype = attr.get('type', 'string')
-                        local_atype = atype.split(':')[-1] if ':' in atype else atype
-                        avalue = self.generate_sample_value(local_atype, node_schema or schema_info)
-                        all_attributes.append((aname, avalue, use))
-
-                    extension = node.find('.//xs:extension', namespaces=NS)
-                    if extension is not None:
-                        base_ref = extension.get('base')
-                        if base_ref:
-                            base_local = base_ref.split(':')[-1] if ':' in base_ref else base_ref
-                            base_ct, base_schema = self.find_complex_type(base_local)
-                            if base_ct is not None:
-                                collect_attributes(base_ct, base_schema)
-
-                collect_attributes(ct, ct_schema or schema_info)
-
-                attr_str = ""
-                if all_attributes:
-                    attr_str = " " + " ".join(f'{aname}="{avalue}"' for aname, avalue, _ in all_attributes)
-
-                result.append(f"{indent}<{name}{attr_str}>")
-
-                all_elements = []
-
-                def collect_elements(node, node_schema):
-                    extension = node.find('.//xs:extension', namespaces=NS)
-                    if extension is not None:
-                        base_ref = extension.get('base')
-                        if base_ref:
-                            base_local = base_ref.split(':')[-1] if ':' in base_ref else base_ref
-                            base_ct, base_schema = self.find_complex_type(base_local)
-                            if base_ct is not None:
-                                collect_elements(base_ct, base_schema)
-
-                        ext_seq = extension.xpath('xs:sequence | xs:all', namespaces=NS)
-                        for seq in ext_seq:
-                            for elem in seq.xpath('xs:element', namespaces=NS):
-                                all_elements.append((elem, node_schema))
-                    else:
-                        seqs = node.xpath('.//xs:sequence | .//xs:all', namespaces=NS)
-                        for seq in seqs:
-                            for elem in seq.xpath('xs:element', namespaces=NS):
-                                all_elements.append((elem, node_schema))
-
-                collect_elements(ct, ct_schema or schema_info)
-
-                for child_elem, child_schema in all_elements:
-                    child_min = child_elem.get('minOccurs', '1')
-                    if child_min != '0':
-                        result.extend(self.generate_xml_example(child_elem, child_schema, level + 1))
-
-                result.append(f"{indent}</{name}>")
-            else:
-                value = self.generate_sample_value(local_type, schema_info)
-                result.append(f"{indent}<{name}>{value}</{name}>")
+            ct, ct_schema = self.find_complex_type(type_name, schema_info)
+            if ct is None:
+                value = self.generate_sample_value(type_name, schema_info)
+                return [f"{indent}<{name}>{value}</{name}>"]
         else:
-            complex_type = element.find('xs:complexType', namespaces=NS)
-            if complex_type is not None:
-                attr_parts = []
-                for attr in complex_type.xpath('.//xs:attribute', namespaces=NS):
-                    aname = attr.get('name')
-                    if not aname:
-                        continue
-                    atype = attr.get('type', 'string')
-                    local_atype = atype.split(':')[-1] if ':' in atype else atype
-                    avalue = self.generate_sample_value(local_atype, schema_info)
-                    attr_parts.append(f'{aname}="{avalue}"')
-                attr_str = " " + " ".join(attr_parts) if attr_parts else ""
-
-                result.append(f"{indent}<{name}{attr_str}>")
-
-                seqs = complex_type.xpath('.//xs:sequence | .//xs:all', namespaces=NS)
-                for seq in seqs:
-                    for child_elem in seq.xpath('xs:element', namespaces=NS):
-                        child_min = child_elem.get('minOccurs', '1')
-                        if child_min != '0':
-                            result.extend(self.generate_xml_example(child_elem, schema_info, level + 1))
-
-                result.append(f"{indent}</{name}>")
-            else:
-                result.append(f"{indent}<{name}>Пример значения</{name}>")
-
+            ct, ct_schema = element.complex_type, schema_info
+            if ct is None:
+                return [f"{indent}<{name}>Пример значения</{name}>"]
+
+        if path is None:
+            path = set()
+        if id(ct) in path:
+            return [f"{indent}<!-- {name}: рекурсивная ссылка на тип {ct.name or name} -->"]
+        if level >= self.example_max_depth:
+            return [f"{indent}<!-- {name}: превышена глубина примера ({self.example_max_depth}) -->"]
+
+        model = self.content_model(ct, ct_schema)
+        attr_str = ""
+        if model.attributes:
+            attr_str = " " + " ".join(
+                f'{attr.name}="{self.generate_sample_value(attr.type, attr_schema)}"'
+                for attr, attr_schema in model.attributes
+            )
+
+        result = [f"{indent}<{name}{attr_str}>"]
+        path.add(id(ct))
+        try:
+            for child_elem, child_schema in model.elements:
+                if child_elem.min_occurs != '0':
+                    result.extend(self.generate_xml_example(child_elem, child_schema, level + 1, path))
+        finally:
+            path.discard(id(ct))
+        result.append(f"{indent}</{name}>")
         return result
 
     def add_xml_examples(self, doc):
-        doc.add_heading('7. Примеры XML файлов', level=1)
+        doc.add_heading(self.section_heading('7. Примеры XML файлов', '7'), level=1)
 
-        if not self.root_elements:
+        roots = self.documented_roots()
+        if not roots:
             doc.add_paragraph("Корневые элементы не найдены.")
             return
 
-        for schema_name, root_element in self.root_elements.items():
-            doc.add_heading(f'7.1. Пример XML для схемы {schema_name}', level=2)
-
-            schema_info = None
-            for path, info in self.schemas.items():
-                if info['name'] == schema_name:
-                    schema_info = info
-                    break
-
-            if schema_info:
-                try:
-                    example_lines = self.generate_xml_example(root_element, schema_info, 0)
-                    example_xml = '\n'.join(example_lines)
-                    paragraph = doc.add_paragraph()
-                    run = paragraph.add_run(example_xml)
-                    run.font.name = 'Courier New'
-                    run.font.size = Pt(10)
-                except Exception as e:
-                    doc.add_paragraph(f"Ошибка при генерации примера: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+        for schema_name in roots:
+            path = self.schema_paths.get(schema_name)
+            key = ('7', schema_name, self.seed, self.example_max_depth, self.dependency_digests(path))
+            self.render_fragment(doc, key, self.add_xml_example, schema_name)
+
+    def add_xml_example(self, doc, schema_name):
+        root_element = self.root_elements[schema_name]
+        doc.add_heading(f'7.1. Пример XML для схемы {schema_name}', level=2)
+
+        # Каждый пример получает собственную последовательность случайных значений, чтобы не
+        # зависеть от того, какие примеры перестроены, а какие взяты из кэша.
+        if self.seed is not None:
+            self.rng.seed(f"{self.seed}:{schema_name}")
+
+        schema_info = self.symbols.schemas.get(schema_name)
+
+        if schema_info:
+            try:
+                example_lines = self.generate_xml_example(root_element, schema_info, 0)
+                example_xml = '\n'.join(example_lines)
+                doc.add_code(example_xml)
+            except Exception as e:
+                doc.add_paragraph(f"Ошибка при генерации примера: {str(e)}")
+                import traceback
+                traceback.print_exc()
+        else:
+            doc.add_paragraph("Не удалось сгенерировать пример: информация о схеме не найдена.")
+
+    def dependency_digests(self, path):
+        # Хэши файла и всего, что он подключает через xs:include/xs:import (транзитивно).
+        seen = set()
+        stack = [path] if path else []
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(self.schema_includes.get(current, ()))
+        return tuple(sorted((p, self.source_digests.get(p)) for p in seen))
+
+    def fragment_cache_key(self, key_parts):
+        if not self.incremental or self.cache is None:
+            return None
+        return self.cache.key(repr(key_parts).encode('utf-8'))
+
+    def render_fragment(self, doc, key_parts, render, *args):
+        if self.fragment_plan is not None:
+            self.fragment_plan.append((key_parts, render.__name__, args))
+            return
+        if self.volume_fragments is not None:
+            # Фрагменты уже построены при оценке объёма; в томе выводятся только его собственные.
+            # Проходы по разделам детерминированы, поэтому фрагмент определяется порядковым номером,
+            # а не repr() ключа, который для словаря типов и перечислений стоит дорого.
+            index = self.fragment_index
+            self.fragment_index += 1
+            if self.volume is not None and self.unit_volumes[index] != self.volume.number:
+                return
+            if doc.supports_fragments:
+                doc.write_fragment(self.volume_fragments[index])
+                return
+        cache_key = self.fragment_cache_key(key_parts) if doc.supports_fragments else None
+        if cache_key is None and not (doc.supports_fragments and self.fragment_futures):
+            render(doc, *args)
+            return
+
+        fragment = self.cache.get(cache_key) if cache_key else None
+        if fragment is not None:
+            self.fragment_stats['reused'] += 1
+        else:
+            future = self.fragment_futures.pop(repr(key_parts), None) if self.fragment_futures else None
+            if future is not None:
+                fragment = future.result()
             else:
-                doc.add_paragraph("Не удалось сгенерировать пример: информация о схеме не найдена.")
+                writer = FragmentWriter()
+                render(writer, *args)
+                fragment = writer.fragment
+            if cache_key:
+                self.cache.put(cache_key, fragment, evict=False)
+                self.fragment_stats['rendered'] += 1
+        doc.write_fragment(fragment)
+
+    def start_render_pool(self, stack):
+        # Первый проход по разделам без вывода собирает независимые фрагменты (подраздел 4 на схему,
+        # перечисления файла, словарь типов, пример), которые строятся в пуле процессов; второй,
+        # основной проход забирает их по ключу в исходном порядке, так что нумерация и стили те же.
+        from concurrent.futures import ProcessPoolExecutor
+
+        pending = []
+        for key_parts, method_name, args in self.plan_fragments():
+            cache_key = self.fragment_cache_key(key_parts)
+            if cache_key and self.cache.contains(cache_key):
+                continue
+            pending.append((key_parts, method_name, args))
+        # Процессов не больше, чем ядер: на одном ядре пул отрисовки только замедляет построение.
+        workers = min(self.render_workers, os.cpu_count() or 1, len(pending))
+        if workers <= 1 or len(pending) < RENDER_POOL_MIN_FRAGMENTS:
+            return
 
-    def generate_docx(self, xsd_paths, output_path):
-        for path in xsd_paths:
-            self.load_schema(path)
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=init_render_worker, initargs=(self,))
+        stack.callback(pool.shutdown, wait=True, cancel_futures=True)
+        self.fragment_futures = {
+            repr(key_parts): pool.submit(render_fragment_task, method_name, args)
+            for key_parts, method_name, args in pending
+        }
+        stack.callback(setattr, self, 'fragment_futures', None)
+
+    def plan_fragments(self):
+        self.fragment_plan = []
+        try:
+            planner = NullWriter()
+            for _, steps in self.document_sections():
+                for step in steps:
+                    count = len(self.fragment_plan)
+                    step(planner)
+                    self.step_fragments[step.__name__] = len(self.fragment_plan) - count
+            return self.fragment_plan
+        finally:
+            self.fragment_plan = None
+
+    def plan_volumes(self, output_path):
+        # Все фрагменты разделов 4-7 строятся заранее (из кэша, пула или заново) и хранятся в памяти;
+        # их размер в строках таблиц и байтах XML раскладывается по томам в порядке документа.
+        fragments = []
+        volumes = [Volume(1, volume_output_path(output_path, 1))]
+        for key_parts, method_name, args in self.plan_fragments():
+            writer = FragmentWriter()
+            self.render_fragment(writer, key_parts, getattr(self, method_name), *args)
+            rows = sum(data.count(b'<w:tr>') for data in writer.fragment)
+            size = sum(len(data) for data in writer.fragment)
+            volume = volumes[-1]
+            if volume.fragments and ((self.volume_rows and volume.rows + rows > self.volume_rows) or
+                                     (self.volume_bytes and volume.size + size > self.volume_bytes)):
+                volume = Volume(len(volumes) + 1, volume_output_path(output_path, len(volumes) + 1))
+                volumes.append(volume)
+            volume.rows += rows
+            volume.size += size
+            volume.fragments += 1
+
+            fragments.append(writer.fragment)
+            self.unit_volumes.append(volume.number)
+            self.section_volumes.setdefault(key_parts[0], []).append(volume.number)
+            if key_parts[0] == '5':
+                for st, _, _ in key_parts[2]:
+                    self.item_volumes[('5', st.name)] = volume.number
+            elif key_parts[0] != '6':
+                self.item_volumes[(key_parts[0], key_parts[1])] = volume.number
+
+        # Разделы без фрагментов (нет перечислений, нет корневых элементов) выводятся в томе предыдущего.
+        current = 1
+        for section in sorted(set(SECTION_STEPS.values())):
+            numbers = self.section_volumes.setdefault(section, [])
+            if not numbers:
+                numbers.append(1 if section < '4' else current)
+            current = numbers[-1]
+        self.volume_fragments = fragments
+        return volumes
+
+    def in_volume(self, step):
+        section = SECTION_STEPS.get(step.__name__)
+        return self.volume is None or section is None or self.volume.number in self.section_volumes[section]
+
+    def section_heading(self, title, section):
+        # Раздел, начатый в предыдущем томе, продолжается под тем же заголовком с пометкой.
+        if self.volume is not None and self.section_volumes[section][0] != self.volume.number:
+            return f"{title} (продолжение)"
+        return title
+
+    def document_sections(self):
+        return (
+            ('sections_1_3', (self.add_title_page, self.add_contents, self.add_terms, self.add_general_provisions,
+                              self.add_documents_list)),
+            ('section_4', (self.add_xml_structures,)),
+            ('section_5', (self.add_enum_codes,)),
+            ('section_6', (self.add_data_types_section,)),
+            ('section_7', (self.add_xml_examples,)),
+        )
+
+    def add_data_types_section(self, doc):
+        key = ('6', [(st, self.type_files(st)) for st in self.documented_simple_types()])
+        self.render_fragment(doc, key, self.add_data_types_dictionary)
+        doc.add_page_break()
 
-        doc = Document()
+    def generate_docx(self, xsd_paths, output_path, streaming=False, template_path=None):
+        return self.generate(xsd_paths, output_path, 'docx', streaming, template_path)
+
+    def generate(self, xsd_paths, output_path, output_format=None, streaming=False, template_path=None):
+        # Формат по умолчанию определяется расширением: .md, .html и .json - быстрый предпросмотр.
+        # Возвращает список записанных файлов: при делении на тома это <имя>_1, <имя>_2, ...
+        output_format = output_format or output_format_for(output_path)
+        if output_format not in OUTPUT_WRITERS:
+            raise ValueError(f"Неизвестный формат вывода: {output_format}")
+        if (self.volume_rows or self.volume_bytes) and output_format != 'docx':
+            raise ValueError("Деление на тома поддерживается только для DOCX")
+
+        profiler = self.profiler
+        profiler.start()
+        with profiler.stage('load'):
+            self.load_schemas(xsd_paths)
+        if self.prune:
+            with profiler.stage('prune'):
+                self.report_pruning()
+
+        if self.volume_rows or self.volume_bytes:
+            outputs = self.write_volumes(output_path, template_path)
+        else:
+            self.write_document(output_path, output_format, streaming, template_path)
+            outputs = [output_path]
+
+        if self.incremental and self.cache is not None:
+            # Фрагменты записываются без проверки размера кэша, лимит применяется один раз в конце.
+            if self.fragment_stats['rendered']:
+                self.cache.evict()
+            if not self.quiet:
+                print(f"Фрагменты документа: из кэша {self.fragment_stats['reused']}, "
+                      f"построено {self.fragment_stats['rendered']}")
+        # Отчёт профилирования назван по первому записанному файлу.
+        profiler.write_report(outputs[0])
+        return outputs
+
+    def write_document(self, output_path, output_format, streaming=False, template_path=None):
+        profiler = self.profiler
+        if output_format == 'docx' and streaming:
+            writer_class = StreamingDocxWriter
+        else:
+            writer_class = OUTPUT_WRITERS[output_format]
+        doc = writer_class(output_path, template_path)
+        self.fragment_index = 0
+        try:
+            with contextlib.ExitStack() as stack:
+                if self.render_workers > 1 and doc.supports_fragments and self.volume_fragments is None:
+                    with profiler.stage('render_pool'):
+                        self.start_render_pool(stack)
+                for stage, steps in self.document_sections():
+                    with profiler.stage(stage):
+                        for step in steps:
+                            if self.in_volume(step):
+                                step(doc)
+                            else:
+                                self.fragment_index += self.step_fragments[step.__name__]
+        except BaseException:
+            doc.abort()
+            raise
+        with profiler.stage('save'):
+            doc.close()
+
+    def write_volumes(self, output_path, template_path=None):
+        # Каждый том - самостоятельный документ с титулом и содержанием; разделы и подразделы
+        # из других томов в содержании заменяются ссылкой на том. Если бюджет не превышен,
+        # документ один и совпадает с обычным. Фрагменты к этому моменту уже сериализованы,
+        # поэтому тома всегда пишутся потоково: разбирать их обратно в дерево python-docx незачем.
+        profiler = self.profiler
+        try:
+            with contextlib.ExitStack() as stack:
+                with profiler.stage('volumes'):
+                    if self.render_workers > 1:
+                        self.start_render_pool(stack)
+                    volumes = self.plan_volumes(output_path)
+            if len(volumes) == 1:
+                self.write_document(output_path, 'docx', True, template_path)
+                return [output_path]
+            self.volumes = volumes
+            for volume in volumes:
+                self.volume = volume
+                self.write_document(volume.output_path, 'docx', True, template_path)
+                if not self.quiet:
+                    print(f"Том {volume.number}: {volume.output_path} (строк таблиц {volume.rows}, "
+                          f"XML {volume.size / 1024 / 1024:.1f} МБ)")
+            return [volume.output_path for volume in volumes]
+        finally:
+            self.volumes = self.volume = self.volume_fragments = None
+            self.unit_volumes, self.item_volumes, self.section_volumes = [], {}, {}
+
+    def message_schemas(self):
+        # Схемы сообщений - загруженные схемы, которые не подключаются никакой другой схемой.
+        included = {path for paths in self.schema_includes.values() for path in paths}
+        return [path for path in self.schemas if path not in included]
+
+    def message_generator(self, path, render_workers=1):
+        # Генератор одного сообщения получает уже разобранные записи его схемы и всех её зависимостей
+        # в том же порядке, что и при отдельной загрузке. Таблица символов, строки типов и модели
+        # содержимого строятся по этим записям заново: общие для пакета разрешали бы имена в типы
+        # других сообщений.
+        cache, incremental = self.cache, self.incremental
+        quiet = False
+        if cache is None or not incremental:
+            # Фрагменты, общие для сообщений (раздел 4 подключаемых схем, перечисления), строятся один раз
+            # и копируются в следующие документы из кэша в памяти.
+            if self.message_cache is None:
+                self.message_cache = MemorySchemaCache()
+            cache, incremental, quiet = self.message_cache, True, True
+        gen = XSDDocumentationGenerator(cache=cache, seed=self.seed, example_max_depth=self.example_max_depth,
+                                        incremental=incremental, render_workers=render_workers, prune=self.prune)
+        gen.quiet = quiet
+
+        def replay(include_path):
+            include_path = os.path.normpath(include_path)
+            if include_path in gen.visited_files:
+                return
+            gen.visited_files.add(include_path)
+            record = self.schemas.get(include_path)
+            if record is not None:
+                gen.merge_schema(include_path, record, replay, self.source_digests[include_path], quiet=True)
+
+        replay(path)
+        return gen
+
+    def generate_message(self, path, output_path, output_format=None, streaming=False, template_path=None,
+                         render_workers=1):
+        gen = self.message_generator(path, render_workers)
+        gen.generate([], output_path, output_format, streaming, template_path)
+
+    def generate_fan_out(self, xsd_paths, output_dir, output_format='docx', streaming=False, template_path=None,
+                         roots=None, workers=1):
+        # Пакет загружается один раз, затем по каждой схеме сообщения (или по выбранным в roots по имени
+        # схемы или корневого элемента) строится отдельный документ; документы строятся в пуле процессов.
+        with self.profiler.stage('load'):
+            self.load_schemas(xsd_paths)
+        paths = self.message_schemas()
+        if roots:
+            paths = [path for path in self.schemas
+                     if self.schemas[path].name in roots or self.schemas[path].first_element_name in roots]
+        os.makedirs(output_dir, exist_ok=True)
+        # Схемы с одинаковым именем из разных каталогов получают суффикс, как наборы пакетного режима.
+        jobs = []
+        used = set()
+        for path in paths:
+            output_path = os.path.join(output_dir, f"{self.schemas[path].name}.{output_format}")
+            stem, ext = os.path.splitext(output_path)
+            suffix = 1
+            while output_path in used:
+                suffix += 1
+                output_path = f"{stem}_{suffix}{ext}"
+            used.add(output_path)
+            jobs.append((path, output_path))
+
+        # Процессов не больше, чем ядер: на одном ядре пул только добавляет запуск процессов и повторную
+        # сборку общих фрагментов в каждом из них.
+        workers = min(workers, os.cpu_count() or 1, len(jobs) - 1)
+        if workers <= 1 or len(jobs) < FAN_OUT_POOL_MIN_JOBS:
+            return [self.fan_out_message(path, output_path, output_format, streaming, template_path)
+                    for path, output_path in jobs]
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Первый документ строится здесь же: общие фрагменты (раздел 4 подключаемых схем, перечисления)
+        # попадают в кэш сообщений, и процессы пула получают их готовыми вместе с генератором.
+        results = [self.fan_out_message(*jobs[0], output_format, streaming, template_path)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker, initargs=(self,)) as pool:
+            futures = [pool.submit(render_message_task, path, output_path, output_format, streaming, template_path)
+                       for path, output_path in jobs[1:]]
+            return results + [future.result() for future in futures]
+
+    def fan_out_message(self, path, output_path, output_format, streaming, template_path):
+        started = time.perf_counter()
+        try:
+            self.generate_message(path, output_path, output_format, streaming, template_path, self.render_workers)
+            return output_path, time.perf_counter() - started, None
+        except Exception as e:
+            return output_path, time.perf_counter() - started, str(e)
 
-        title = doc.add_heading('Описание форматов электронных документов', 0)
-        title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    def add_title_page(self, doc):
+        doc.add_heading('Описание форматов электронных документов', 0, align='center')
+        if self.volume is not None:
+            doc.add_heading(f"Том {self.volume.number} из {len(self.volumes)}", 1, align='center')
         doc.add_page_break()
 
+    def add_contents(self, doc):
         doc.add_heading('Содержание:', level=1)
+        # Пункты содержания с номером тома, в котором они находятся (None - документ не делится на тома).
+        volume_of = self.item_volume
         content_items = [
-            "1. Термины, определения и сокращения",
-            "2. Общие положения",
-            "3. Перечень электронных документов",
-            "4. Справочник XML-структур"
+            ("1. Термины, определения и сокращения", volume_of('1')),
+            ("2. Общие положения", volume_of('2')),
+            ("3. Перечень электронных документов", volume_of('3')),
+            ("4. Справочник XML-структур", volume_of('4'))
         ]
 
-        for i, schema in enumerate(sorted(self.schemas.values(), key=lambda x: x['name']), start=1):
-            content_items.append(f"4.{i}. {schema['name']}")
-        content_items.append("5. Справочник глобальных кодов")
-
-        for i, etype in enumerate(sorted(self.enum_types.keys()), start=1):
-            content_items.append(f"5.{i}. {etype}")
-
-        content_items.append("6. Словарь типов данных")
-
-        if any('string' in info['base_type'].lower() for info in self.simple_types):
-            content_items.append("6.1. Строковые типы (string)")
-        if any('decimal' in info['base_type'].lower() for info in self.simple_types):
-            content_items.append("6.2. Десятичные типы (decimal)")
-        if any(any(t in info['base_type'].lower() for t in ['int', 'integer', 'long', 'short', 'byte']) for info in self.simple_types):
-            content_items.append("6.3. Целочисленные типы (int)")
-        if any(any(t in info['base_type'].lower() for t in ['date', 'time']) for info in self.simple_types):
-            content_items.append("6.4. Типы даты и времени (date и dateTime)")
-        content_items.append("6.5. Остальные типы")
-        content_items.append("7. Примеры XML файлов")
-
-        for i, schema_name in enumerate(sorted(self.root_elements.keys()), start=1):
-            content_items.append(f"7.{i}. Пример XML для схемы {schema_name}")
-
-        for item in content_items:
-            doc.add_paragraph(item, style='List Number')
+        schemas = [schema for schema in self.schemas.values() if self.documented_schema(schema)]
+        for i, schema in enumerate(sorted(schemas, key=lambda x: x.name), start=1):
+            content_items.append((f"4.{i}. {schema.name}", volume_of('4', i)))
+        content_items.append(("5. Справочник глобальных кодов", volume_of('5')))
+
+        for i, etype in enumerate(self.documented_enum_names(), start=1):
+            content_items.append((f"5.{i}. {etype}", volume_of('5', etype)))
+
+        content_items.append(("6. Словарь типов данных", volume_of('6')))
+
+        classes = self.classify_simple_types()
+        for category, title in DATA_TYPE_SECTIONS:
+            if classes[category] or category == 'other':
+                content_items.append((title, volume_of('6')))
+        content_items.append(("7. Примеры XML файлов", volume_of('7')))
+
+        for i, schema_name in enumerate(sorted(self.documented_roots()), start=1):
+            content_items.append((f"7.{i}. Пример XML для схемы {schema_name}", volume_of('7', schema_name)))
+
+        # Подряд идущие пункты другого тома сворачиваются в одну ссылку на этот том.
+        start = 0
+        while start < len(content_items):
+            item, number = content_items[start]
+            end = start + 1
+            if number == (self.volume.number if self.volume is not None else None):
+                doc.add_paragraph(item, style='ListNumber')
+                start = end
+                continue
+            while end < len(content_items) and content_items[end][1] == number:
+                end += 1
+            last = content_items[end - 1][0]
+            title = item if end - start == 1 else f"{item} … {last}"
+            path = os.path.basename(self.volumes[number - 1].output_path)
+            doc.add_paragraph(f"{title} — см. том {number} ({path})", style='ListNumber')
+            start = end
         doc.add_page_break()
 
+    def item_volume(self, section, item=None):
+        if self.volume is None:
+            return None
+        if item is not None and (section, item) in self.item_volumes:
+            return self.item_volumes[(section, item)]
+        return self.section_volumes[section][0]
+
+    def add_terms(self, doc):
         doc.add_heading('1. Термины, определения и сокращения', level=1)
         doc.add_paragraph('XML – Extensible Markup Language, расширяемый язык разметки.')
         doc.add_page_break()
 
+    def add_general_provisions(self, doc):
         doc.add_heading('2. Общие положения', level=1)
         doc.add_paragraph('Общие положения отсутствуют.')
         doc.add_page_break()
 
+    def add_documents_list(self, doc):
         doc.add_heading('3. Перечень электронных документов', level=1)
-        msg_table = doc.add_table(rows=1, cols=2, style='Table Grid')
-        hdr_cells = msg_table.rows[0].cells
-        for i, h in enumerate(["Наименование документа", "ID документа <XMLMsgNm>"]):
-            p = hdr_cells[i].paragraphs[0]
-            p.add_run(h).bold = True
-            self.add_shading(hdr_cells[i])
-        for schema in sorted(self.schemas.values(), key=lambda x: x['name']):
-            doc_name = schema['first_element_doc'] if schema['first_element_doc'] else "—"
-            msg_id = schema['name'] if schema['name'] else "—"
+        msg_table = []
+        for schema in sorted(self.schemas.values(), key=lambda x: x.name):
+            doc_name = schema.first_element_doc if schema.first_element_doc else "—"
+            msg_id = schema.name if schema.name else "—"
             self.add_row_to_table(msg_table, [doc_name, msg_id])
+        doc.add_table(["Наименование документа", "ID документа <XMLMsgNm>"], msg_table)
         doc.add_page_break()
 
-        doc.add_heading('4. Справочник XML-структур', level=1)
-        for i, (path, schema) in enumerate(sorted(self.schemas.items()), start=1):
-            doc.add_heading(f"4.{i}. {schema['name']}", level=2)
-            table = self.create_table_with_header(doc, [
-                "Имя XML-типа в словаре",
-                "Название XML-элемента в блоке",
-                "Тип данных",
-                "Содержание и значение XML-элемента",
-                "Обязательность в XML-типе"
-            ], [Inches(1.8), Inches(1.4), Inches(1.3), Inches(2.5), Inches(1.0)])
-
-            types_used_by_elements = set()
-            if schema['global_elements']:
-                for elem in schema['global_elements']:
-                    elem_type = elem.get('type')
-                    if elem_type:
-                        local_type_name = elem_type.split(':')[-1] if ':' in elem_type else elem_type
-                        if local_type_name in schema['complex_types']:
-                            types_used_by_elements.add(local_type_name)
-
-            if schema['global_elements']:
-                for elem in schema['global_elements']:
-                    name = elem.get('name')
-                    type_name = elem.get('type')
-                    min_occurs = elem.get('minOccurs', '1')
-                    required = "Да" if min_occurs == '1' else "Нет"
-
-                    if elem.getparent().tag == f"{{{NS['xs']}}}choice":
-                        required = "Нет\nВыбор"
-
-                    if type_name:
-                        local_type = type_name.split(':')[-1] if ':' in type_name else type_name
-                        self.add_row_to_table(table, ["", name, local_type, get_doc(elem), required])
-                        if local_type in schema['complex_types']:
-                            self.describe_type(table, schema['complex_types'][local_type], schema, 1)
-                    else:
-                        complex_type = elem.find('xs:complexType', namespaces=NS)
-                        if complex_type is not None:
-                            self.add_row_to_table(table, ["", name, "блок", get_doc(elem), required])
-                            self.describe_type(table, complex_type, schema, 1)
-                            self.add_row_to_table(table, ["", f"/{name}", "", "Конец блока", ""])
-                        else:
-                            self.add_row_to_table(table, ["", name, "string", get_doc(elem), required])
-            else:
-                doc.add_paragraph("Глобальные элементы не найдены.")
-
-            standalone_types = set(schema['complex_types'].keys()) - types_used_by_elements
-            if standalone_types:
-                doc.add_paragraph("Автономные типы (не связанные напрямую с элементами):")
-                for type_name in sorted(standalone_types):
-                    ct = schema['complex_types'][type_name]
-                    self.describe_type(table, ct, schema, 0)
-
-            doc.add_paragraph()
+    def add_xml_structures(self, doc):
+        doc.add_heading(self.section_heading('4. Справочник XML-структур', '4'), level=1)
+        paths = [path for path in sorted(self.schemas) if self.documented_schema(self.schemas[path])]
+        for i, path in enumerate(paths, start=1):
+            key = ('4', i, self.dependency_digests(path), self.documented_names(self.schemas[path]))
+            self.render_fragment(doc, key, self.add_schema_structure, i, path)
         doc.add_page_break()
 
-        doc.add_heading('5. Справочник глобальных кодов', level=1)
-        enum_entries = [st for st in self.simple_types if st.get('is_enum', False) and st['name'] in self.enum_types]
+    def add_schema_structure(self, doc, i, path):
+        schema = self.schemas[path]
+        doc.add_heading(f"4.{i}. {schema.name}", level=2)
+        table = []
+        notes = []
+
+        elements = self.documented_elements(schema)
+        types_used_by_elements = set()
+        if elements:
+            for elem in elements:
+                if elem.type:
+                    ct, ct_schema = self.find_complex_type(elem.type, schema)
+                    if ct_schema is schema:
+                        types_used_by_elements.add(ct.name)
+
+        if elements:
+            for elem in elements:
+                name = elem.name
+                type_name = elem.type
+                required = "Да" if elem.min_occurs == '1' else "Нет"
+
+                if elem.in_choice:
+                    required = "Нет\nВыбор"
+
+                if type_name:
+                    local_type = type_name.split(':')[-1] if ':' in type_name else type_name
+                    self.add_row_to_table(table, ["", name, local_type, elem.doc, required])
+                    ct, ct_schema = self.find_complex_type(type_name, schema)
+                    if ct_schema is schema:
+                        self.describe_type(table, ct, schema, 1)
+                else:
+                    complex_type = elem.complex_type
+                    if complex_type is not None:
+                        self.add_row_to_table(table, ["", name, "блок", elem.doc, required])
+                        self.describe_type(table, complex_type, schema, 1)
+                        self.add_row_to_table(table, ["", f"/{name}", "", "Конец блока", ""])
+                    else:
+                        self.add_row_to_table(table, ["", name, "string", elem.doc, required])
+        elif not schema.global_elements:
+            notes.append("Глобальные элементы не найдены.")
+
+        standalone_types = set(schema.complex_types.keys()) - types_used_by_elements
+        if self.reachable is not None:
+            standalone_types = {name for name in standalone_types if id(schema.complex_types[name]) in self.reachable}
+        if standalone_types:
+            notes.append("Автономные типы (не связанные напрямую с элементами):")
+            for type_name in sorted(standalone_types):
+                ct = schema.complex_types[type_name]
+                self.describe_type(table, ct, schema, 0)
+
+        doc.add_table([
+            "Имя XML-типа в словаре",
+            "Название XML-элемента в блоке",
+            "Тип данных",
+            "Содержание и значение XML-элемента",
+            "Обязательность в XML-типе"
+        ], table, [inches(1.8), inches(1.4), inches(1.3), inches(2.5), inches(1.0)], autofit=False)
+        for note in notes:
+            doc.add_paragraph(note)
+        doc.add_paragraph()
+
+    def add_enum_codes(self, doc):
+        doc.add_heading(self.section_heading('5. Справочник глобальных кодов', '5'), level=1)
+        enum_entries = [st for st in self.documented_simple_types() if st.is_enum and st.name in self.enum_types]
 
         if not enum_entries:
             doc.add_paragraph("Перечисления (enum) не найдены.")
         else:
-            sorted_enum_entries = sorted(enum_entries, key=lambda x: (x['file'], x['name']))
-            for i, st in enumerate(sorted_enum_entries, start=1):
-                type_name = st['name']
-                file_name = st['file']
-                description = st['description']
-                values = self.enum_types[type_name]
-
-                doc.add_heading(f"5.{i}. {type_name}", level=2)
-                if description.strip():
-                    p = doc.add_paragraph()
-                    p.add_run(description).italic = True
-
-                enum_table = doc.add_table(rows=1, cols=3, style='Table Grid')
-                hdr_cells = enum_table.rows[0].cells
-                headers = ["Имя XSD-файла", "Код", "Описание"]
-                for col_idx, header in enumerate(headers):
-                    p = hdr_cells[col_idx].paragraphs[0]
-                    p.add_run(header).bold = True
-                    self.add_shading(hdr_cells[col_idx])
-
-                for code, desc in values:
-                    row_cells = enum_table.add_row().cells
-                    row_cells[0].text = file_name
-                    row_cells[1].text = code
-                    row_cells[2].text = desc
-                    for cell in row_cells:
-                        for p in cell.paragraphs:
-                            p.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                            for run in p.runs:
-                                run.font.size = Pt(10)
-                doc.add_paragraph()
+            sorted_enum_entries = sorted(enum_entries, key=lambda x: (x.file, x.name))
+            # Фрагмент - перечисления одного файла; ключ включает сами значения и список файлов,
+            # в которых определено такое же перечисление.
+            start = 0
+            while start < len(sorted_enum_entries):
+                end = start + 1
+                while end < len(sorted_enum_entries) and sorted_enum_entries[end].file == sorted_enum_entries[start].file:
+                    end += 1
+                group = []
+                for st in sorted_enum_entries[start:end]:
+                    interned = self.interned_types[(st.name, st.fingerprint)]
+                    group.append((st, interned.values, ", ".join(interned.files)))
+                self.render_fragment(doc, ('5', start + 1, group), self.add_enum_group, start + 1, group)
+                start = end
         doc.add_page_break()
 
-        self.add_data_types_dictionary(doc)
-        doc.add_page_break()
+    def add_enum_group(self, doc, first, group):
+        for i, (st, values, file_name) in enumerate(group, start=first):
+            type_name = st.name
+            description = st.description
+
+            doc.add_heading(f"5.{i}. {type_name}", level=2)
+            if description.strip():
+                doc.add_paragraph(description, italic=True)
+
+            enum_table = []
+            for code, desc in values:
+                self.add_row_to_table(enum_table, [file_name, code, desc])
+            doc.add_table(["Имя XSD-файла", "Код", "Описание"], enum_table)
+            doc.add_paragraph()
 
-        self.add_xml_examples(doc)
 
-        doc.save(output_path)
+def expand_inputs(patterns):
+    # Файлы, маски и каталоги раскрываются в упорядоченный список XSD без повторов.
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, '*.xsd')))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            raise FileNotFoundError(f"Файл не найден: {pattern}")
+        if not matches:
+            raise FileNotFoundError(f"XSD-файлы не найдены: {pattern}")
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def batch_output_path(pattern, output_dir, output_format='docx'):
+    # abspath: у '.' и '..' берётся имя каталога, а не сама точка.
+    name = os.path.basename(os.path.abspath(pattern.split('*')[0] or os.getcwd()))
+    stem = os.path.splitext(name)[0] or 'schemas'
+    return os.path.join(output_dir, f"{stem}.{output_format}")
+
+
+def generate_set(xsd_paths, output_path, options, cache=None):
+    # Точка входа рабочего процесса пакетного режима: возвращает результат вместо исключения,
+    # чтобы ошибка в одном наборе не останавливала остальные. Первый элемент - список записанных
+    # файлов (при ошибке - запрошенный путь).
+    started = time.perf_counter()
+    try:
+        if cache is None and not options.get('no_cache'):
+            cache = SchemaCache(options.get('cache_dir'))
+        gen = XSDDocumentationGenerator(cache=cache, load_workers=options.get('load_workers', 1),
+                                        seed=options.get('seed'),
+                                        example_max_depth=options.get('example_max_depth',
+                                                                      DEFAULT_EXAMPLE_MAX_DEPTH),
+                                        incremental=options.get('incremental', False),
+                                        profile=options.get('profile', False),
+                                        render_workers=options.get('render_workers', 1),
+                                        stream_parse=options.get('stream_parse', False),
+                                        prune=options.get('prune', False), roots=options.get('roots'),
+                                        volume_rows=options.get('volume_rows'),
+                                        volume_bytes=options.get('volume_bytes'))
+        outputs = gen.generate(xsd_paths, output_path, options.get('format'),
+                               streaming=options.get('streaming', False), template_path=options.get('template'))
+        return outputs, time.perf_counter() - started, None
+    except Exception as e:
+        return [output_path], time.perf_counter() - started, str(e)
+
+
+def run_batch(args, options):
+    from concurrent.futures import ProcessPoolExecutor
+
+    output_dir = args.output or os.getcwd()
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    used = set()
+    for pattern in args.inputs:
+        output_path = batch_output_path(pattern, output_dir, options.get('format') or 'docx')
+        stem, ext = os.path.splitext(output_path)
+        suffix = 1
+        while output_path in used:
+            suffix += 1
+            output_path = f"{stem}_{suffix}{ext}"
+        used.add(output_path)
+        jobs.append((expand_inputs([pattern]), output_path))
+
+    started = time.perf_counter()
+    failed = 0
+    workers = min(args.jobs or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_set, paths, output_path, options) for paths, output_path in jobs]
+        for future in futures:
+            outputs, elapsed, error = future.result()
+            if error:
+                failed += 1
+                print(f"Ошибка при генерации {outputs[0]}: {error}", file=sys.stderr)
+            else:
+                print(f"Документация сохранена: {', '.join(outputs)} ({elapsed:.2f} с)")
+    print(f"Наборов: {len(jobs)}, ошибок: {failed}, процессов: {workers}, "
+          f"общее время: {time.perf_counter() - started:.2f} с")
+    return 1 if failed else 0
+
+
+# Параметры запроса службы, которые передаются генератору; остальные берутся из параметров запуска службы.
+# Шаблон задаётся только при запуске службы: запрос не выбирает произвольные файлы для чтения.
+SERVICE_REQUEST_OPTIONS = ('format', 'seed', 'example_max_depth', 'streaming', 'incremental', 'stream_parse',
+                           'prune', 'roots')
+
+
+class GenerationService:
+    # Долгоживущий генератор: общий кэш в памяти избавляет запросы от повторного разбора общих
+    # зависимостей (cbr_ed_basetypes, cbr_ed_leaftypes, cbr_ed_objects), а пул потоков
+    # ограничивает число одновременно строящихся документов. Потоки делят один кэш, но не процессор:
+    # построение документа держит GIL, так что одновременные запросы выполняются по очереди.
+    def __init__(self, options, workers=None, cache=None, output_dir=None):
+        self.options = options
+        # Документы пишутся только внутрь output_dir; output в запросе - путь относительно него.
+        self.output_dir = os.path.realpath(output_dir or os.getcwd())
+        if cache is None:
+            backing = None if options.get('no_cache') else SchemaCache(options.get('cache_dir'))
+            cache = MemorySchemaCache(backing=backing)
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed = 0
+
+    def generate(self, request):
+        inputs = request.get('inputs')
+        if not inputs or not isinstance(inputs, list):
+            raise ValueError("В запросе нет списка inputs")
+        options = dict(self.options)
+        options.update((name, request[name]) for name in SERVICE_REQUEST_OPTIONS if name in request)
+        depth = options.get('example_max_depth', DEFAULT_EXAMPLE_MAX_DEPTH)
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 1:
+            raise ValueError("example_max_depth должна быть положительным целым числом")
+        xsd_paths = expand_inputs(inputs)
+        for path in xsd_paths:
+            if not (path.lower().endswith('.xsd') or is_schema_archive(path)):
+                raise ValueError(f"Не XSD-файл и не ZIP-архив: {path}")
+        output_path = self.output_path(request.get('output'), xsd_paths[0], options.get('format') or 'docx')
+        future = self.pool.submit(generate_set, xsd_paths, output_path, options, self.cache)
+        outputs, elapsed, error = future.result()
+        with self.lock:
+            self.requests += 1
+            if error:
+                self.failed += 1
+        return {'output': outputs[0], 'outputs': outputs, 'seconds': round(elapsed, 4), 'error': error}
+
+    def output_path(self, output, first_input, output_format):
+        if not output:
+            output = os.path.splitext(os.path.basename(first_input))[0] + '.' + output_format
+        if not isinstance(output, str) or os.path.isabs(output):
+            raise ValueError("output должен быть путём относительно каталога документов службы")
+        output_path = os.path.realpath(os.path.join(self.output_dir, output))
+        if os.path.commonpath([output_path, self.output_dir]) != self.output_dir or output_path == self.output_dir:
+            raise ValueError(f"output вне каталога документов службы: {output}")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return output_path
+
+    def stats(self):
+        with self.lock:
+            return {'generator_version': GENERATOR_VERSION, 'workers': self.workers, 'requests': self.requests,
+                    'failed': self.failed, 'cache': self.cache.stats()}
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def make_service_handler(service):
+    from http.server import BaseHTTPRequestHandler
+
+    class ServiceHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self.send_json(200, service.stats())
+            else:
+                self.send_json(404, {'error': f"Неизвестный путь: {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/generate':
+                self.send_json(404, {'error': f"Неизвестный путь: {self.path}"})
+                return
+            # Простые запросы (text/plain, формы) браузер отправляет с любой страницы без предварительного
+            # CORS-запроса; application/json так отправить нельзя.
+            content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+            if content_type != 'application/json':
+                self.send_json(415, {'error': "Ожидается Content-Type: application/json"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict):
+                    raise ValueError("Запрос должен быть объектом JSON")
+                result = service.generate(request)
+            except (ValueError, FileNotFoundError) as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            self.send_json(500 if result['error'] else 200, result)
+
+        def address_string(self):
+            # У Unix-сокета нет адреса клиента.
+            return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    return ServiceHandler
+
+
+def make_service_server(service, host='127.0.0.1', port=DEFAULT_SERVICE_PORT, socket_path=None):
+    import socketserver
+    from http.server import ThreadingHTTPServer
+
+    handler = make_service_handler(service)
+    if socket_path is None:
+        return ThreadingHTTPServer((host, port), handler)
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise FileExistsError(f"Путь --socket существует и не является сокетом: {socket_path}")
+        os.remove(socket_path)
+    return UnixHTTPServer(socket_path, handler)
+
+
+def run_service(args, options):
+    import signal
+
+    service = GenerationService(options, workers=args.jobs, output_dir=args.output)
+    server = make_service_server(service, args.host, args.port, args.socket)
+    address = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Служба генерации запущена: {address}, потоков: {service.workers}")
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # SIGTERM (остановка службы менеджером процессов) завершает работу так же, как Ctrl+C.
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+def run_fan_out(args, options):
+    xsd_paths = expand_inputs(args.inputs)
+    output_dir = args.output or os.getcwd()
+    cache = None if options.get('no_cache') else SchemaCache(options.get('cache_dir'))
+    gen = XSDDocumentationGenerator(cache=cache, load_workers=options.get('load_workers', 1),
+                                    seed=options.get('seed'),
+                                    example_max_depth=options.get('example_max_depth', DEFAULT_EXAMPLE_MAX_DEPTH),
+                                    incremental=options.get('incremental', False),
+                                    render_workers=options.get('render_workers', 1),
+                                    stream_parse=options.get('stream_parse', False),
+                                    prune=options.get('prune', False))
+    started = time.perf_counter()
+    results = gen.generate_fan_out(xsd_paths, output_dir, options.get('format') or 'docx',
+                                   streaming=options.get('streaming', False), template_path=options.get('template'),
+                                   roots=args.roots, workers=args.jobs or os.cpu_count() or 1)
+    failed = 0
+    for output_path, elapsed, error in results:
+        if error:
+            failed += 1
+            print(f"Ошибка при генерации {output_path}: {error}", file=sys.stderr)
+        else:
+            print(f"Документация сохранена: {output_path} ({elapsed:.2f} с)")
+    print(f"Документов: {len(results)}, ошибок: {failed}, общее время: {time.perf_counter() - started:.2f} с")
+    return 1 if failed or not results else 0
+
 
+def run_gui():
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
 
-def main():
     root = tk.Tk()
     root.withdraw()
 
     messagebox.showinfo("Выбор XSD", "Выберите все XSD-файлы схемы")
     xsd_paths = filedialog.askopenfilenames(
         title="Выберите XSD-файлы",
-        filetypes=[("XSD файлы", "*.xsd")],
+        filetypes=[("XSD файлы", "*.xsd"), ("ZIP-архивы со схемами", "*.zip")],
         multiple=True
     )
     if not xsd_paths:
@@ -768,7 +3099,7 @@ def main():
         return
 
     try:
-        gen = XSDDocumentationGenerator()
+        gen = XSDDocumentationGenerator(cache=SchemaCache())
         gen.generate_docx(xsd_paths, docx_path)
         messagebox.showinfo("Готово", f"Документация сохранена:\n{docx_path}")
     except Exception as e:
@@ -778,5 +3109,109 @@ def main():
         messagebox.showerror("Ошибка", f"Произошла ошибка при генерации документа:\n{str(e)}")
 
 
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Генерация документации DOCX по XSD-схемам. Без аргументов запускается графический режим."
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="XSD-файлы, ZIP-архивы со схемами, маски (например, 'schemas/*.xsd') или каталоги")
+    parser.add_argument('-o', '--output',
+                        help="Путь к документу; в пакетном режиме и режимах --fan-out и --serve - каталог для документов")
+    parser.add_argument('-f', '--format', choices=sorted(OUTPUT_WRITERS),
+                        help="Формат вывода: docx или быстрый предпросмотр md, html, json "
+                             "(по умолчанию - по расширению -o, иначе docx)")
+    parser.add_argument('--batch', action='store_true',
+                        help="Каждый аргумент - отдельный набор схем, по одному DOCX на набор")
+    parser.add_argument('--fan-out', action='store_true',
+                        help="Загрузить все схемы один раз и построить по документу на каждую схему сообщения")
+    parser.add_argument('--roots', nargs='+',
+                        help="Имена схем или корневых элементов: для них строятся документы в режиме --fan-out, "
+                             "от них ведётся отсечение --prune")
+    parser.add_argument('--prune', action='store_true',
+                        help="Документировать только типы, достижимые из корневых элементов")
+    parser.add_argument('--volume-rows', type=int, default=None,
+                        help="Делить документ на тома не больше заданного числа строк таблиц")
+    parser.add_argument('--volume-mb', type=float, default=None,
+                        help="Делить документ на тома не больше заданного объёма XML тела документа, МБ")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Число процессов пакетного режима и режима --fan-out или потоков службы")
+    parser.add_argument('--streaming', action='store_true', help="Потоковая запись DOCX")
+    parser.add_argument('--render-workers', type=int, default=1,
+                        help="Число процессов для параллельной отрисовки разделов 4-7 (0 - по числу ядер)")
+    parser.add_argument('--load-workers', type=int, default=1,
+                        help="Число потоков параллельной загрузки графа xs:include/xs:import (0 - по числу ядер)")
+    parser.add_argument('--template', help="Шаблон DOCX со стилями")
+    parser.add_argument('--seed', type=int, default=None, help="Начальное значение генератора примеров XML")
+    parser.add_argument('--example-depth', type=int, default=DEFAULT_EXAMPLE_MAX_DEPTH,
+                        help=f"Наибольшая глубина вложенности примеров XML (по умолчанию {DEFAULT_EXAMPLE_MAX_DEPTH})")
+    parser.add_argument('--cache-dir', help="Каталог кэша разобранных схем")
+    parser.add_argument('--no-cache', action='store_true', help="Не использовать кэш разобранных схем")
+    parser.add_argument('--stream-parse', action='store_true',
+                        help="Разбирать XSD потоково (iterparse) без построения полного дерева")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Брать из кэша разделы, исходные XSD которых не изменились")
+    parser.add_argument('--profile', action='store_true',
+                        help="Замерить время и память этапов; отчёт JSON пишется рядом с DOCX")
+    parser.add_argument('--serve', action='store_true',
+                        help="Запустить службу генерации (POST /generate, GET /stats) с общим кэшем схем в памяти")
+    parser.add_argument('--host', default='127.0.0.1', help="Адрес службы")
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVICE_PORT, help="Порт службы")
+    parser.add_argument('--socket', help="Unix-сокет службы вместо TCP-порта")
+    parser.add_argument('--gui', action='store_true', help="Графический режим выбора файлов")
+    return parser
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.gui or not (args.inputs or args.serve):
+        run_gui()
+        return 0
+
+    options = {
+        'streaming': args.streaming,
+        'template': args.template,
+        'seed': args.seed,
+        'example_max_depth': args.example_depth,
+        'cache_dir': args.cache_dir,
+        'no_cache': args.no_cache,
+        'incremental': args.incremental,
+        'stream_parse': args.stream_parse,
+        'prune': args.prune,
+        'roots': args.roots,
+        'volume_rows': args.volume_rows,
+        'volume_bytes': int(args.volume_mb * 1024 * 1024) if args.volume_mb else None,
+        'profile': args.profile,
+        'format': args.format,
+        'render_workers': args.render_workers or os.cpu_count() or 1,
+        'load_workers': args.load_workers or os.cpu_count() or 1,
+    }
+    if args.example_depth < 1:
+        parser.error("--example-depth должна быть положительной")
+    if args.volume_rows or args.volume_mb:
+        output_format = args.format or ('docx' if args.batch or args.serve else output_format_for(args.output or ''))
+        if output_format != 'docx' or args.fan_out:
+            parser.error("--volume-rows и --volume-mb поддерживаются только для DOCX и без --fan-out")
+    if args.serve:
+        return run_service(args, options)
+    try:
+        if args.batch:
+            return run_batch(args, options)
+        if args.fan_out:
+            return run_fan_out(args, options)
+
+        xsd_paths = expand_inputs(args.inputs)
+        output_path = args.output or os.path.splitext(xsd_paths[0])[0] + '.' + (args.format or 'docx')
+    except FileNotFoundError as e:
+        parser.error(str(e))
+
+    outputs, elapsed, error = generate_set(xsd_paths, output_path, options)
+    if error:
+        print(f"Ошибка при генерации документа: {error}", file=sys.stderr)
+        return 1
+    print(f"Документация сохранена: {', '.join(outputs)} ({elapsed:.2f} с)")
+    return 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
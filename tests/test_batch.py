@@ -0,0 +1,23 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import batch_output_path
+
+
+class BatchOutputPathTest(unittest.TestCase):
+    def test_directory_patterns(self):
+        self.assertEqual(batch_output_path('schemas/*.xsd', 'out'), os.path.join('out', 'schemas.docx'))
+        self.assertEqual(batch_output_path('schemas/ed503.xsd', 'out', 'md'), os.path.join('out', 'ed503.md'))
+
+    def test_relative_dots_use_directory_name(self):
+        cwd = os.getcwd()
+        self.assertEqual(batch_output_path('.', 'out'), os.path.join('out', f"{os.path.basename(cwd)}.docx"))
+        parent = os.path.basename(os.path.dirname(cwd)) or 'schemas'
+        self.assertEqual(batch_output_path('..', 'out'), os.path.join('out', f"{parent}.docx"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import XSDDocumentationGenerator
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+EXAMPLE_MESSAGE = 'cbr_ed503_v2026.03.0.xsd'
+
+MESSAGE_XSD = '''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="{root}" type="DocType"/>
+  <xs:complexType name="DocType">
+    <xs:sequence>
+      <xs:element name="{field}" type="xs:{field_type}"/>
+    </xs:sequence>
+  </xs:complexType>
+</xs:schema>
+'''
+
+
+def write_message(path, root, field, field_type):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(MESSAGE_XSD.format(root=root, field=field, field_type=field_type))
+
+
+class FanOutTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def fan_out(self, paths, output_dir, workers=1):
+        gen = XSDDocumentationGenerator(seed=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return gen.generate_fan_out(paths, output_dir, 'md', workers=workers)
+
+    def standalone(self, path, output_path):
+        with contextlib.redirect_stdout(io.StringIO()):
+            XSDDocumentationGenerator(seed=0).generate([path], output_path, 'md')
+        with open(output_path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_messages_do_not_share_types(self):
+        # Одноимённые типы без пространства имён в разных сообщениях разрешаются внутри своего сообщения.
+        m1 = os.path.join(self.directory, 'm1.xsd')
+        m2 = os.path.join(self.directory, 'm2.xsd')
+        write_message(m1, 'Doc1', 'Alpha', 'string')
+        write_message(m2, 'Doc2', 'Beta', 'int')
+        output_dir = os.path.join(self.directory, 'out')
+        results = self.fan_out([m1, m2], output_dir)
+        self.assertEqual([error for _, _, error in results], [None, None])
+
+        for path, name in ((m1, 'm1'), (m2, 'm2')):
+            with open(os.path.join(output_dir, f'{name}.md'), encoding='utf-8') as f:
+                fan_out = f.read()
+            self.assertEqual(fan_out, self.standalone(path, os.path.join(self.directory, f'{name}.md')))
+        with open(os.path.join(output_dir, 'm2.md'), encoding='utf-8') as f:
+            self.assertNotIn('Alpha', f.read())
+
+    def test_same_name_in_different_directories(self):
+        paths = []
+        for version in ('v1', 'v2'):
+            version_dir = os.path.join(self.directory, version)
+            os.makedirs(version_dir)
+            for name in os.listdir(EXAMPLE_DIR):
+                if name.endswith('.xsd'):
+                    shutil.copy(os.path.join(EXAMPLE_DIR, name), version_dir)
+            paths.append(os.path.join(version_dir, EXAMPLE_MESSAGE))
+        output_dir = os.path.join(self.directory, 'out')
+        results = self.fan_out(paths, output_dir, workers=2)
+
+        outputs = [output_path for output_path, _, error in results if error is None]
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(len(set(outputs)), 2)
+        self.assertTrue(all(os.path.exists(path) for path in outputs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import SchemaCache, XSDDocumentationGenerator
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+EXAMPLE_MESSAGE = 'cbr_ed503_v2026.03.0.xsd'
+
+
+def load(paths, cache_dir):
+    gen = XSDDocumentationGenerator(cache=SchemaCache(cache_dir))
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen.load_schemas(paths)
+    return gen
+
+
+class SchemaCacheNamesTest(unittest.TestCase):
+    # Имя схемы берётся из пути файла, а не из записи кэша, сохранённой для файла с тем же содержимым.
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for name in os.listdir(EXAMPLE_DIR):
+            if name.endswith('.xsd'):
+                shutil.copy(os.path.join(EXAMPLE_DIR, name), self.directory)
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.original = os.path.join(self.directory, EXAMPLE_MESSAGE)
+
+    def schema_names(self, gen):
+        return {record.name for record in gen.schemas.values()}
+
+    def test_renamed_file(self):
+        load([self.original], self.cache_dir)
+        renamed = os.path.join(self.directory, 'renamed_msg.xsd')
+        os.rename(self.original, renamed)
+
+        gen = load([renamed], self.cache_dir)
+        self.assertIn('renamed_msg', self.schema_names(gen))
+        self.assertNotIn('cbr_ed503_v2026.03.0', self.schema_names(gen))
+        record = gen.schemas[os.path.normpath(renamed)]
+        self.assertTrue(all(st.file == 'renamed_msg' for st in record.simple_types))
+
+    def test_duplicate_files(self):
+        duplicate = os.path.join(self.directory, 'duplicate_msg.xsd')
+        shutil.copy(self.original, duplicate)
+        load([self.original], self.cache_dir)
+
+        gen = load([self.original, duplicate], self.cache_dir)
+        self.assertLessEqual({'cbr_ed503_v2026.03.0', 'duplicate_msg'}, self.schema_names(gen))
+        self.assertEqual(gen.schemas[os.path.normpath(duplicate)].name, 'duplicate_msg')
+        self.assertEqual(gen.schemas[os.path.normpath(self.original)].name, 'cbr_ed503_v2026.03.0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import io
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import contextlib
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import GenerationService, make_service_server
+
+EXAMPLE_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example',
+                            'cbr_ed503_v2026.03.0.xsd')
+
+
+class ServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.output_dir = os.path.join(self.directory, 'docs')
+        os.makedirs(self.output_dir)
+        self.service = GenerationService({'no_cache': True, 'seed': 0, 'format': 'md'}, workers=1,
+                                         output_dir=self.output_dir)
+        self.server = make_service_server(self.service, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.service.close)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/generate"
+
+    def post(self, request, content_type='application/json'):
+        body = json.dumps(request).encode('utf-8')
+        post = urllib.request.Request(self.url, body, {'Content-Type': content_type})
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                with urllib.request.urlopen(post) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+    def test_output_inside_output_dir(self):
+        status, result = self.post({'inputs': [EXAMPLE_ROOT], 'output': 'ed503.md'})
+        self.assertEqual(status, 200)
+        self.assertEqual(result['output'], os.path.join(os.path.realpath(self.output_dir), 'ed503.md'))
+        self.assertTrue(os.path.exists(result['output']))
+
+    def test_output_outside_output_dir_rejected(self):
+        for output in (os.path.join(self.directory, 'escape.md'), '../escape.md', 'sub/../../escape.md'):
+            status, _ = self.post({'inputs': [EXAMPLE_ROOT], 'output': output})
+            self.assertEqual(status, 400)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'escape.md')))
+
+    def test_requires_json_content_type(self):
+        status, _ = self.post({'inputs': [EXAMPLE_ROOT], 'output': 'plain.md'}, 'text/plain')
+        self.assertEqual(status, 415)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'plain.md')))
+
+    def test_non_schema_inputs_rejected(self):
+        other = os.path.join(self.directory, 'notes.txt')
+        with open(other, 'w') as f:
+            f.write('text')
+        status, _ = self.post({'inputs': [other], 'output': 'notes.md'})
+        self.assertEqual(status, 400)
+
+    def test_example_depth(self):
+        status, _ = self.post({'inputs': [EXAMPLE_ROOT], 'output': 'shallow.md', 'example_max_depth': 1})
+        self.assertEqual(status, 200)
+        with open(os.path.join(self.output_dir, 'shallow.md'), encoding='utf-8') as f:
+            self.assertIn('превышена глубина примера (1)', f.read())
+        status, _ = self.post({'inputs': [EXAMPLE_ROOT], 'output': 'zero.md', 'example_max_depth': 0})
+        self.assertEqual(status, 400)
+
+    def test_socket_path_must_be_socket(self):
+        regular = os.path.join(self.directory, 'regular')
+        with open(regular, 'w') as f:
+            f.write('keep')
+        with self.assertRaises(FileExistsError):
+            make_service_server(self.service, socket_path=regular)
+        self.assertTrue(os.path.exists(regular))
+
+
+if __name__ == '__main__':
+    unittest.main()
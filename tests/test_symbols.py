@@ -0,0 +1,82 @@
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import XSDDocumentationGenerator
+
+ENUM_XSD = '''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:simpleType name="CodeType">
+    <xs:restriction base="xs:string">
+      <xs:enumeration value="{code}"/>
+    </xs:restriction>
+  </xs:simpleType>
+</xs:schema>
+'''
+
+DERIVED_XSD = '''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:simpleType name="NumberCategory">
+    <xs:restriction base="xs:integer"/>
+  </xs:simpleType>
+  <xs:simpleType name="QuantityType">
+    <xs:restriction base="NumberCategory">
+      <xs:totalDigits value="3"/>
+      <xs:minInclusive value="1"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="IdentifierCategory">
+    <xs:restriction base="xs:string"/>
+  </xs:simpleType>
+  <xs:simpleType name="DrawerIDType">
+    <xs:restriction base="IdentifierCategory">
+      <xs:pattern value="\\d{10}"/>
+    </xs:restriction>
+  </xs:simpleType>
+</xs:schema>
+'''
+
+
+class SymbolTableTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_first_enum_definition_wins(self):
+        # Как и для остальных таблиц, при повторном определении остаётся первое загруженное.
+        paths = []
+        for name, code in (('first', 'A'), ('second', 'B')):
+            path = os.path.join(self.directory, f'{name}.xsd')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(ENUM_XSD.format(code=code))
+            paths.append(path)
+        gen = XSDDocumentationGenerator()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.load_schemas(paths)
+        first = gen.schemas[os.path.normpath(paths[0])]
+        self.assertIs(gen.symbols.enum('CodeType', first), first.enum_types['CodeType'])
+        st, _ = gen.symbols.simple_type('CodeType', first)
+        self.assertIn(st, first.simple_types)
+
+    def test_sample_values_follow_derivation(self):
+        # Образец подбирается по встроенному типу в конце цепочки и унаследованным ограничениям.
+        path = os.path.join(self.directory, 'derived.xsd')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(DERIVED_XSD)
+        gen = XSDDocumentationGenerator(seed=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.load_schemas([path])
+        schema = gen.schemas[os.path.normpath(path)]
+        for _ in range(20):
+            self.assertIn(int(gen.generate_sample_value('QuantityType', schema)), range(1, 1000))
+            self.assertRegex(gen.generate_sample_value('DrawerIDType', schema), r'^\d{10}$')
+
+
+if __name__ == '__main__':
+    unittest.main()